@@ -0,0 +1,187 @@
+"""Shared construction of the model, MCP client and tools used by agents"""
+import atexit
+import os
+from pathlib import Path
+from typing import Optional
+
+from mcp.client.sse import sse_client
+from strands.models.ollama import OllamaModel
+from strands.tools.mcp import MCPClient
+from strands.tools.registry import ToolRegistry
+from strands_tools import calculator, current_time, file_read, file_write  # noqa: F401
+
+from replay import (
+    RecordingMCPClient,
+    RecordingModel,
+    RecordingTool,
+    ReplayMCPClient,
+    ReplayModel,
+    ReplayTool,
+    Trace,
+    TraceHooks,
+    TraceWriter,
+)
+from tool_selector import ToolIndex, ToolSelector
+from tools.piper_speak import piper_speak, set_audio_sink
+
+# Configuration
+OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434")
+OLLAMA_LLM = os.getenv("OLLAMA_LLM", "qwen3:14b")
+MCP_SERVER_URL = os.getenv("MCP_SERVER_URL", "http://localhost:8080/sse")
+TOOL_SELECTOR_TOP_K = int(os.getenv("TOOL_SELECTOR_TOP_K", "8"))
+TOOL_SELECTOR_PINNED = os.getenv("TOOL_SELECTOR_PINNED", "current_time").split(",")
+TOOL_SELECTOR_HISTORY = int(os.getenv("TOOL_SELECTOR_HISTORY", "3"))
+# Record/replay: "" (live), "record" or "replay"
+HIVE_TRACE_MODE = os.getenv("HIVE_TRACE_MODE", "")
+HIVE_TRACE_FILE = Path(os.getenv("HIVE_TRACE_FILE", "trace.jsonl.gz"))
+HIVE_TRACE_SPEED = float(os.getenv("HIVE_TRACE_SPEED", "1.0"))
+# Local tools that still run for real in replay; the rest return recorded results
+HIVE_REPLAY_LIVE_TOOLS = os.getenv("HIVE_REPLAY_LIVE_TOOLS", "piper_speak").split(",")
+
+# Local tools, run on the host
+LOCAL_TOOLS_BY_NAME = {
+    # "calculator": calculator,
+    "current_time": current_time,
+    "file_read": file_read,
+    "file_write": file_write,
+    "piper_speak": piper_speak,  # TTS stays local on host
+}
+LOCAL_TOOLS = list(LOCAL_TOOLS_BY_NAME.values())
+
+
+def local_tools(names: list[str]) -> list:
+    """Pick local tools by name, raising ValueError for unknown ones"""
+    names = [name.strip() for name in names if name.strip()]
+    unknown = [name for name in names if name not in LOCAL_TOOLS_BY_NAME]
+    if unknown:
+        raise ValueError(f"Unknown local tools {unknown}, choose from {list(LOCAL_TOOLS_BY_NAME)}")
+    return [LOCAL_TOOLS_BY_NAME[name] for name in names]
+
+_trace_writer = None
+_trace = None
+
+
+def set_trace_mode(mode: str, path: Optional[Path] = None, speed: Optional[float] = None):
+    """
+    Switch record/replay mode after import (the HIVE_TRACE_* variables are read once).
+
+    Args:
+        mode: "" (live), "record" or "replay"
+        path: Trace file, default unchanged
+        speed: Replay speed, default unchanged
+    """
+    global HIVE_TRACE_MODE, HIVE_TRACE_FILE, HIVE_TRACE_SPEED, _trace
+    close_trace_writer()
+    HIVE_TRACE_MODE = mode
+    if path is not None:
+        HIVE_TRACE_FILE = Path(path)
+    if speed is not None:
+        HIVE_TRACE_SPEED = speed
+    _trace = None
+    # Replay hosts usually have no sound device; piper_speak still synthesizes
+    # speech so its cost stays in the measurement, but the audio is discarded
+    set_audio_sink("null" if mode == "replay" else os.getenv("PIPER_AUDIO_SINK", "device"))
+
+
+
+def _get_trace_writer() -> TraceWriter:
+    global _trace_writer
+    if _trace_writer is None:
+        _trace_writer = TraceWriter(HIVE_TRACE_FILE)
+        # Without a close, a .gz trace lacks its end-of-stream marker
+        atexit.register(close_trace_writer)
+    return _trace_writer
+
+
+def close_trace_writer():
+    """Close the trace being recorded, if any; safe to call more than once"""
+    global _trace_writer
+    if _trace_writer is not None:
+        _trace_writer.close()
+        _trace_writer = None
+
+
+def _get_trace() -> Trace:
+    global _trace
+    if _trace is None:
+        _trace = Trace(HIVE_TRACE_FILE)
+    return _trace
+
+
+set_trace_mode(HIVE_TRACE_MODE)
+
+
+def create_model(**client_args):
+    """
+    Create the Ollama model, or its record/replay wrapper in trace mode.
+
+    Args:
+        client_args: Extra arguments for the ollama client, passed through to
+                     httpx (e.g. a shared transport to pool connections)
+    """
+    if HIVE_TRACE_MODE == "replay":
+        return ReplayModel(_get_trace(), speed=HIVE_TRACE_SPEED)
+    model = OllamaModel(
+        host=OLLAMA_HOST,
+        model_id=OLLAMA_LLM,
+        ollama_client_args=client_args or None,
+    )
+    if HIVE_TRACE_MODE == "record":
+        return RecordingModel(model, _get_trace_writer())
+    return model
+
+
+def create_mcp_client():
+    """Create an MCP client for the HTTP/SSE transport (not yet connected)"""
+    if HIVE_TRACE_MODE == "replay":
+        return ReplayMCPClient(_get_trace(), speed=HIVE_TRACE_SPEED)
+    client = MCPClient(
+        lambda: sse_client(MCP_SERVER_URL)
+    )
+    if HIVE_TRACE_MODE == "record":
+        return RecordingMCPClient(client, _get_trace_writer())
+    return client
+
+
+def create_local_tools(tools: Optional[list] = None) -> list:
+    """
+    Local tools as the current trace mode needs them.
+
+    In record mode their results are written to the trace. In replay mode
+    they return the recorded results, except HIVE_REPLAY_LIVE_TOOLS (the
+    TTS being measured), which still run.
+
+    Args:
+        tools: Tools to prepare (default LOCAL_TOOLS)
+    """
+    tools = LOCAL_TOOLS if tools is None else tools
+    if not HIVE_TRACE_MODE:
+        return list(tools)
+    # Tools may be strands_tools modules; load them into AgentTools to wrap them
+    registry = ToolRegistry()
+    registry.process_tools(list(tools))
+    loaded = list(registry.registry.values())
+    if HIVE_TRACE_MODE == "record":
+        return [RecordingTool(tool, _get_trace_writer()) for tool in loaded]
+    return [
+        tool if tool.tool_name in HIVE_REPLAY_LIVE_TOOLS
+        else ReplayTool(tool.tool_spec, _get_trace(), speed=HIVE_TRACE_SPEED)
+        for tool in loaded
+    ]
+
+
+def create_trace_hooks() -> list:
+    """Agent hooks needed by the current trace mode"""
+    if HIVE_TRACE_MODE == "record":
+        return [TraceHooks(_get_trace_writer())]
+    return []
+
+
+def create_selector(index: ToolIndex) -> ToolSelector:
+    """Create a per-agent tool selector over a shared tool index"""
+    return ToolSelector(
+        index,
+        top_k=TOOL_SELECTOR_TOP_K,
+        pinned=TOOL_SELECTOR_PINNED,
+        history=TOOL_SELECTOR_HISTORY,
+    )
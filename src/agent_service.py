@@ -0,0 +1,304 @@
+"""
+Multi-session agent service
+
+Hosts many concurrent conversations in one asyncio process. All sessions
+share a single MCP client connection, one Ollama model whose HTTP connections
+come from a shared pool, and one tool index; each session only owns its
+Agent (conversation history plus tool selection state).
+
+The MCP server sees the whole service as one client, so its per-client
+admission limit (MCP_MAX_CALLS_PER_CLIENT) bounds tool calls across all
+sessions and should be sized for the service.
+
+Host-side tools run with the service's own permissions on behalf of any
+client, so sessions only get AGENT_SERVICE_LOCAL_TOOLS (current_time by
+default, no file access). The service listens on 127.0.0.1 unless told
+otherwise; set AGENT_SERVICE_TOKEN before exposing it to a network.
+
+Run with:
+    poetry run python src/agent_service.py
+"""
+import asyncio
+import hmac
+import logging
+import os
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Optional
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route, WebSocketRoute
+from starlette.websockets import WebSocket, WebSocketDisconnect
+from strands import Agent
+from strands.agent.conversation_manager import SlidingWindowConversationManager
+
+from agent_factory import (
+    close_trace_writer,
+    create_local_tools,
+    create_mcp_client,
+    create_model,
+    create_selector,
+    create_trace_hooks,
+    local_tools,
+)
+from tool_selector import ToolIndex, ToolSelector
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+SERVICE_HOST = os.getenv("AGENT_SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.getenv("AGENT_SERVICE_PORT", "8000"))
+# Bearer token required on every request when set
+SERVICE_TOKEN = os.getenv("AGENT_SERVICE_TOKEN", "")
+# Host-side tools every session gets; file_read/file_write would expose the
+# host's files to any client, so they are opt-in
+SERVICE_LOCAL_TOOLS = os.getenv("AGENT_SERVICE_LOCAL_TOOLS", "current_time").split(",")
+MAX_SESSIONS = int(os.getenv("AGENT_MAX_SESSIONS", "200"))
+SESSION_IDLE_TIMEOUT = float(os.getenv("AGENT_SESSION_IDLE_TIMEOUT", "900"))
+# Messages of history kept per session
+SESSION_WINDOW_SIZE = int(os.getenv("AGENT_SESSION_WINDOW_SIZE", "40"))
+# Connections in the shared Ollama HTTP pool
+OLLAMA_MAX_CONNECTIONS = int(os.getenv("OLLAMA_MAX_CONNECTIONS", "8"))
+
+EVICTION_INTERVAL = 30.0
+
+
+@dataclass
+class Session:
+    """One conversation and the agent serving it"""
+    agent: Agent
+    selector: ToolSelector
+    last_active: float = field(default_factory=time.monotonic)
+    turns: int = 0
+    # Strands agents reject concurrent invocations, so turns are serialized
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class AgentService:
+    """Creates, serves and evicts per-session agents over shared resources"""
+
+    def __init__(self):
+        self.sessions: OrderedDict[str, Session] = OrderedDict()
+        self.evicted = 0
+        self._transport: Optional[httpx.AsyncHTTPTransport] = None
+        self._mcp_client = None
+        self._model = None
+        self._index: Optional[ToolIndex] = None
+        self._eviction_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Connect to MCP and set up the shared model; call from the server loop"""
+        # Every ollama client the model creates reuses this transport's connection pool
+        self._transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(max_connections=OLLAMA_MAX_CONNECTIONS),
+        )
+        self._model = create_model(transport=self._transport)
+
+        self._mcp_client = create_mcp_client()
+        await asyncio.to_thread(self._mcp_client.start)
+        mcp_tools = await asyncio.to_thread(self._mcp_client.list_tools_sync)
+        logger.info(f"Connected to MCP server - {len(mcp_tools)} tools available")
+
+        self._index = ToolIndex(create_local_tools(local_tools(SERVICE_LOCAL_TOOLS)) + mcp_tools)
+        self._eviction_task = asyncio.create_task(self._evict_idle_loop())
+
+    async def stop(self):
+        if self._eviction_task:
+            self._eviction_task.cancel()
+        self.sessions.clear()
+        if self._mcp_client:
+            await asyncio.to_thread(self._mcp_client.stop, None, None, None)
+        if self._transport:
+            await self._transport.aclose()
+        close_trace_writer()
+
+    def _new_session(self) -> Session:
+        selector = create_selector(self._index)
+        agent = Agent(
+            model=self._model,
+            tools=selector.initial_tools(),
+            hooks=[selector] + create_trace_hooks(),
+            conversation_manager=SlidingWindowConversationManager(window_size=SESSION_WINDOW_SIZE),
+            callback_handler=None,
+        )
+        return Session(agent=agent, selector=selector)
+
+    def get_session(self, session_id: str) -> Session:
+        """Get a session, creating it and evicting the least recently used if full"""
+        session = self.sessions.get(session_id)
+        if session is None:
+            while len(self.sessions) >= MAX_SESSIONS and self._evict_lru():
+                pass
+            session = self._new_session()
+            self.sessions[session_id] = session
+            logger.info(f"Session '{session_id}' created ({len(self.sessions)} active)")
+        self.sessions.move_to_end(session_id)
+        session.last_active = time.monotonic()
+        return session
+
+    def close_session(self, session_id: str) -> bool:
+        return self.sessions.pop(session_id, None) is not None
+
+    def _evict_lru(self) -> bool:
+        """Drop the least recently used idle session, False if all are busy"""
+        for session_id, session in self.sessions.items():
+            if not session.lock.locked():
+                del self.sessions[session_id]
+                self.evicted += 1
+                logger.info(f"Session '{session_id}' evicted to make room")
+                return True
+        return False
+
+    def evict_idle(self) -> int:
+        """Drop sessions idle for longer than SESSION_IDLE_TIMEOUT, skipping busy ones"""
+        cutoff = time.monotonic() - SESSION_IDLE_TIMEOUT
+        idle = [
+            session_id for session_id, session in self.sessions.items()
+            if session.last_active < cutoff and not session.lock.locked()
+        ]
+        for session_id in idle:
+            del self.sessions[session_id]
+            self.evicted += 1
+        if idle:
+            logger.info(f"Evicted {len(idle)} idle sessions ({len(self.sessions)} active)")
+        return len(idle)
+
+    async def _evict_idle_loop(self):
+        while True:
+            await asyncio.sleep(EVICTION_INTERVAL)
+            self.evict_idle()
+
+    async def stream(self, session_id: str, prompt: str) -> AsyncIterator[str]:
+        """Run one turn in a session, yielding text as the model generates it"""
+        session = self.get_session(session_id)
+        async with session.lock:
+            try:
+                async for event in session.agent.stream_async(prompt):
+                    if "data" in event:
+                        yield event["data"]
+            finally:
+                session.turns += 1
+                session.last_active = time.monotonic()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "sessions": len(self.sessions),
+            "max_sessions": MAX_SESSIONS,
+            "busy_sessions": sum(1 for s in self.sessions.values() if s.lock.locked()),
+            "evicted": self.evicted,
+            "tools": len(self._index.tools) if self._index else 0,
+        }
+
+
+service = AgentService()
+
+
+async def chat(request: Request) -> JSONResponse:
+    """Run one turn and return the full response: POST {"prompt": "..."}"""
+    try:
+        body = await request.json()
+    except ValueError:
+        return JSONResponse({"error": "body must be valid JSON"}, status_code=400)
+    prompt = body.get("prompt") if isinstance(body, dict) else None
+    if not isinstance(prompt, str) or not prompt:
+        return JSONResponse({"error": "body must be an object with a non-empty \"prompt\" string"}, status_code=400)
+    session_id = request.path_params["session_id"]
+    try:
+        chunks = [chunk async for chunk in service.stream(session_id, prompt)]
+    except Exception as e:
+        logger.exception(f"Turn failed in session '{session_id}'")
+        return JSONResponse({"session_id": session_id, "error": str(e)}, status_code=500)
+    report = service.sessions[session_id].selector.last_report if session_id in service.sessions else None
+    return JSONResponse({"session_id": session_id, "response": "".join(chunks), "tools": report})
+
+
+async def delete_session(request: Request) -> JSONResponse:
+    closed = service.close_session(request.path_params["session_id"])
+    return JSONResponse({"closed": closed}, status_code=200 if closed else 404)
+
+
+async def stats(request: Request) -> JSONResponse:
+    return JSONResponse(service.stats())
+
+
+async def chat_ws(websocket: WebSocket):
+    """
+    Stream turns over a WebSocket.
+
+    Each text message is a prompt; the reply is a series of
+    {"type": "delta", "data": ...} messages followed by {"type": "done"}.
+    """
+    session_id = websocket.path_params["session_id"]
+    await websocket.accept()
+    try:
+        while True:
+            prompt = await websocket.receive_text()
+            try:
+                async for chunk in service.stream(session_id, prompt):
+                    await websocket.send_json({"type": "delta", "data": chunk})
+            except WebSocketDisconnect:
+                raise
+            except Exception as e:
+                logger.exception(f"Turn failed in session '{session_id}'")
+                await websocket.send_json({"type": "error", "error": str(e)})
+                continue
+            await websocket.send_json({"type": "done"})
+    except WebSocketDisconnect:
+        logger.info(f"WebSocket for session '{session_id}' disconnected")
+
+
+class TokenAuthMiddleware:
+    """ASGI middleware that requires AGENT_SERVICE_TOKEN as a bearer token, if set"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket") or not SERVICE_TOKEN:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        scheme, _, token = headers.get(b"authorization", b"").decode("latin-1").partition(" ")
+        if scheme.lower() == "bearer" and hmac.compare_digest(token, SERVICE_TOKEN):
+            await self.app(scope, receive, send)
+            return
+
+        if scope["type"] == "websocket":
+            await WebSocket(scope, receive, send).close(code=1008)
+        else:
+            response = JSONResponse({"error": "unauthorized"}, status_code=401)
+            await response(scope, receive, send)
+
+
+@asynccontextmanager
+async def lifespan(app: Starlette):
+    await service.start()
+    yield
+    await service.stop()
+
+
+app = Starlette(
+    routes=[
+        Route("/sessions/{session_id}/chat", chat, methods=["POST"]),
+        Route("/sessions/{session_id}", delete_session, methods=["DELETE"]),
+        Route("/stats", stats, methods=["GET"]),
+        WebSocketRoute("/sessions/{session_id}/ws", chat_ws),
+    ],
+    middleware=[Middleware(TokenAuthMiddleware)],
+    lifespan=lifespan,
+)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    if SERVICE_HOST not in ("127.0.0.1", "localhost", "::1") and not SERVICE_TOKEN:
+        logger.warning(f"Serving on {SERVICE_HOST} without AGENT_SERVICE_TOKEN; anyone who can reach it can run the agent")
+    uvicorn.run(app, host=SERVICE_HOST, port=SERVICE_PORT)
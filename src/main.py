@@ -1,51 +1,47 @@
 from strands import Agent
-from strands.models.ollama import OllamaModel
-from strands_tools import calculator, current_time, file_read, file_write
-from tools.piper_speak import piper_speak
-from mcp.client.sse import sse_client
-from strands.tools.mcp import MCPClient
-import os
-
-# Configuration
-OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434")
-OLLAMA_LLM = os.getenv("OLLAMA_LLM", "qwen3:14b")
-MCP_SERVER_URL = os.getenv("MCP_SERVER_URL", "http://localhost:8080/sse")
+from agent_factory import create_local_tools, create_mcp_client, create_model, create_selector, create_trace_hooks
+from tool_selector import ToolIndex
 
 # Initialize Ollama model
-ollama = OllamaModel(
-	host=OLLAMA_HOST,
-	model_id=OLLAMA_LLM,
-)
+ollama = create_model()
 
 # Create MCP client for HTTP transport
-mcp_client = MCPClient(
-	lambda: sse_client(MCP_SERVER_URL)
-)
+mcp_client = create_mcp_client()
 
 # Connect to MCP server and get tools
 mcp_client.__enter__()
-	
+
 # List available MCP tools
 mcp_tools = mcp_client.list_tools_sync()
 print(f"Connected to MCP server - {len(mcp_tools)} tools available")
 
 # Combine local tools with MCP tools
-agent_tools = [
-	# calculator,
-	current_time,
-	file_read,
-	file_write,
-	piper_speak,  # TTS stays local on host
-]
+agent_tools = create_local_tools()
 all_tools = agent_tools + mcp_tools
 
-# Create agent with all tools
+# Only the pinned tools and the best matches for each turn are shown to the model
+tool_index = ToolIndex(all_tools)
+tool_selector = create_selector(tool_index)
+
+# Create agent with all tools available through the selector
 agent = Agent(
 	model=ollama,
-	tools=all_tools,
+	tools=tool_selector.initial_tools(),
+	hooks=[tool_selector] + create_trace_hooks(),
 )
 
 print(f"Agent initialized with {len(all_tools)} total tools")
 print("Local tools:", [agent_tools])
 if mcp_tools:
 	print("MCP tools:", [tool.tool_name for tool in mcp_tools])
+
+def chat(prompt):
+	"""Run one agent turn and report how many tool schema tokens it saved"""
+	result = agent(prompt)
+	report = tool_selector.last_report
+	if report:
+		print(
+			f"\nTools exposed: {report['exposed_count']}/{report['total_count']} "
+			f"(~{report['schema_tokens']} schema tokens, ~{report['schema_tokens_saved']} saved)"
+		)
+	return result
@@ -0,0 +1,340 @@
+"""Admission control and backpressure for the MCP server"""
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+from typing import Any, Optional
+
+from fastmcp.exceptions import ToolError
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+from starlette.responses import JSONResponse
+
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+# Lower value is served first
+PRIORITY_CLASSES = {"high": 0, "normal": 1, "low": 2}
+DEFAULT_PRIORITY = "normal"
+
+MIN_RETRY_AFTER = 0.5
+# Weight of the newest sample in the service time moving average
+SERVICE_TIME_ALPHA = 0.2
+
+
+class Overloaded(Exception):
+    """Raised when a request is shed instead of admitted"""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"Server overloaded ({reason}), retry after {retry_after:.1f}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Bounds in-flight tool calls and open sessions.
+
+    Tool calls beyond a client's own share of max_per_client wait in line
+    behind that client's calls, and calls beyond max_concurrent wait in a
+    priority queue. Both queues together hold at most max_queued entries, and
+    a call waits at most queue_timeout seconds in total; anything beyond that
+    is rejected with a retry-after hint instead of piling up. A limit of 0
+    disables it.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 0,
+        max_per_client: int = 0,
+        max_queued: int = 0,
+        queue_timeout: float = 10.0,
+        max_sessions: int = 0,
+        max_sessions_per_client: int = 0,
+        priorities: Optional[dict[str, str]] = None,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_per_client = max_per_client
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.max_sessions = max_sessions
+        self.max_sessions_per_client = max_sessions_per_client
+        self.priorities = {}
+        for tool, name in (priorities or {}).items():
+            if name not in PRIORITY_CLASSES:
+                raise ValueError(f"Unknown priority class '{name}' for tool '{tool}'")
+            self.priorities[tool] = name
+
+        self._in_flight = 0
+        self._waiting = Counter()
+        self._queue: list[tuple[int, int, asyncio.Future, str]] = []
+        self._seq = itertools.count()
+        # Calls holding one of their client's max_per_client shares
+        self._client_load = Counter()
+        # Calls waiting for a share, per client in arrival order
+        self._client_waiters: dict[str, deque[asyncio.Future]] = {}
+        self._client_queued = 0
+        self._service_time = 0.0
+
+        self._sessions = 0
+        self._client_sessions = Counter()
+
+        self._admitted = 0
+        self._shed = Counter()
+
+    def priority_of(self, tool: str) -> str:
+        return self.priorities.get(tool, DEFAULT_PRIORITY)
+
+    def queued(self) -> int:
+        """Calls waiting for either a client share or a slot"""
+        return sum(self._waiting.values()) + self._client_queued
+
+    def retry_after(self) -> float:
+        """Rough time until a slot frees up, from queue depth and service time"""
+        slots = self.max_concurrent or 1
+        backlog = self.queued() + 1
+        return max(MIN_RETRY_AFTER, round(self._service_time * backlog / slots, 1))
+
+    def _shed_request(self, reason: str) -> Overloaded:
+        self._shed[reason] += 1
+        error = Overloaded(reason, self.retry_after())
+        logger.warning(str(error))
+        return error
+
+    # Tool calls
+
+    @staticmethod
+    async def _wait(future: asyncio.Future, deadline: Optional[float]) -> bool:
+        """Wait for a hand-over until the deadline, True if it happened"""
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        await asyncio.wait({future}, timeout=timeout)
+        return future.done()
+
+    async def acquire(self, client: str, tool: str):
+        """Wait for a tool call slot, raising Overloaded if none is available in time"""
+        deadline = time.monotonic() + self.queue_timeout if self.queue_timeout else None
+        await self._acquire_client_share(client, deadline)
+        try:
+            await self._acquire_slot(tool, deadline)
+        except BaseException:
+            self._release_client_share(client)
+            raise
+        self._admitted += 1
+
+    async def _acquire_client_share(self, client: str, deadline: Optional[float]):
+        """Take one of the client's shares, queueing behind its own calls if all are taken"""
+        if not self.max_per_client or self._client_load[client] < self.max_per_client:
+            self._client_load[client] += 1
+            return
+
+        if self.max_queued and self.queued() >= self.max_queued:
+            raise self._shed_request("queue_full")
+
+        future = asyncio.get_running_loop().create_future()
+        self._client_waiters.setdefault(client, deque()).append(future)
+        self._client_queued += 1
+        try:
+            handed_over = await self._wait(future, deadline)
+        except BaseException:
+            # Caller was cancelled while queued; pass on a share we were just given
+            if future.done():
+                self._release_client_share(client)
+            else:
+                self._drop_client_waiter(client, future)
+            raise
+
+        if not handed_over:
+            self._drop_client_waiter(client, future)
+            raise self._shed_request("client_limit")
+        # The share was handed over by _release_client_share
+
+    def _drop_client_waiter(self, client: str, future: asyncio.Future):
+        future.cancel()
+        self._client_queued -= 1
+        waiters = self._client_waiters[client]
+        waiters.remove(future)
+        if not waiters:
+            del self._client_waiters[client]
+
+    def _release_client_share(self, client: str):
+        """Free a client share, handing it straight to that client's next queued call if any"""
+        waiters = self._client_waiters.get(client)
+        if waiters:
+            waiters.popleft().set_result(None)
+            self._client_queued -= 1
+            if not waiters:
+                del self._client_waiters[client]
+            return
+        self._client_load[client] -= 1
+        if self._client_load[client] <= 0:
+            del self._client_load[client]
+
+    async def _acquire_slot(self, tool: str, deadline: Optional[float]):
+        """Take a concurrency slot, queueing by priority if none is free"""
+        queued = sum(self._waiting.values())
+        if not self.max_concurrent or (self._in_flight < self.max_concurrent and not queued):
+            self._in_flight += 1
+            return
+
+        if self.max_queued and self.queued() >= self.max_queued:
+            raise self._shed_request("queue_full")
+
+        priority = self.priority_of(tool)
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (PRIORITY_CLASSES[priority], next(self._seq), future, priority))
+        self._waiting[priority] += 1
+        try:
+            handed_over = await self._wait(future, deadline)
+        except BaseException:
+            # Caller was cancelled while queued; hand back a slot we were just given
+            if future.done():
+                self._release_slot()
+            else:
+                self._abandon(future, priority)
+            raise
+
+        if not handed_over:
+            self._abandon(future, priority)
+            raise self._shed_request("timeout")
+        # The slot was handed over by _release_slot
+
+    def _abandon(self, future: asyncio.Future, priority: str):
+        """Drop a queued call; its heap entry is skipped when popped"""
+        future.cancel()
+        self._waiting[priority] -= 1
+
+    def _release_slot(self):
+        """Free a slot, handing it straight to the best queued call if any"""
+        while self._queue:
+            _, _, future, priority = heapq.heappop(self._queue)
+            if not future.done():
+                future.set_result(None)
+                self._waiting[priority] -= 1
+                return
+        self._in_flight -= 1
+
+    def release(self, client: str, elapsed: float):
+        """Return a slot acquired by acquire()"""
+        self._release_client_share(client)
+        self._service_time += SERVICE_TIME_ALPHA * (elapsed - self._service_time)
+        if self.max_concurrent:
+            self._release_slot()
+        else:
+            self._in_flight -= 1
+
+    @asynccontextmanager
+    async def slot(self, client: str, tool: str):
+        """Hold a tool call slot for the duration of the block"""
+        await self.acquire(client, tool)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(client, time.monotonic() - start)
+
+    # Sessions
+
+    def open_session(self, client: str):
+        """Count a new session, raising Overloaded if a session limit is reached"""
+        if self.max_sessions and self._sessions >= self.max_sessions:
+            raise self._shed_request("sessions")
+        if self.max_sessions_per_client and self._client_sessions[client] >= self.max_sessions_per_client:
+            raise self._shed_request("client_sessions")
+        self._sessions += 1
+        self._client_sessions[client] += 1
+
+    def close_session(self, client: str):
+        self._sessions -= 1
+        self._client_sessions[client] -= 1
+        if self._client_sessions[client] <= 0:
+            del self._client_sessions[client]
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "in_flight": self._in_flight,
+            "max_concurrent": self.max_concurrent,
+            "queue_depth": sum(self._waiting.values()),
+            "queue_depth_by_priority": {name: self._waiting[name] for name in PRIORITY_CLASSES},
+            "client_queue_depth": self._client_queued,
+            "max_queued": self.max_queued,
+            "sessions": self._sessions,
+            "max_sessions": self.max_sessions,
+            "admitted": self._admitted,
+            "shed": dict(self._shed),
+            "shed_total": sum(self._shed.values()),
+            "avg_service_time": round(self._service_time, 4),
+            "retry_after": self.retry_after(),
+        }
+
+
+def _client_key(context: MiddlewareContext) -> str:
+    """Identify the caller of a tool: MCP client id, else session id"""
+    ctx = context.fastmcp_context
+    if ctx is not None:
+        for attr in ("client_id", "session_id"):
+            try:
+                value = getattr(ctx, attr)
+            except Exception:
+                continue
+            if value:
+                return str(value)
+    return "anonymous"
+
+
+class AdmissionMiddleware(Middleware):
+    """FastMCP middleware that runs every tool call through the controller"""
+
+    def __init__(self, controller: AdmissionController):
+        self.controller = controller
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        try:
+            async with self.controller.slot(_client_key(context), context.message.name):
+                return await call_next(context)
+        except Overloaded as e:
+            raise ToolError(str(e)) from e
+
+
+class SessionLimitMiddleware:
+    """ASGI middleware that caps concurrent SSE sessions, keyed by client address"""
+
+    def __init__(self, app, controller: AdmissionController, path: str = "/sse"):
+        self.app = app
+        self.controller = controller
+        self.path = path
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] != self.path:
+            await self.app(scope, receive, send)
+            return
+
+        client = (scope.get("client") or ("unknown",))[0]
+        try:
+            self.controller.open_session(client)
+        except Overloaded as e:
+            response = JSONResponse(
+                {"error": "overloaded", "reason": e.reason, "retry_after": e.retry_after},
+                status_code=503,
+                headers={"Retry-After": str(max(1, round(e.retry_after)))},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.close_session(client)
+
+
+admission = AdmissionController(
+    max_concurrent=config.max_concurrent_calls,
+    max_per_client=config.max_calls_per_client,
+    max_queued=config.max_queued_calls,
+    queue_timeout=config.queue_timeout,
+    max_sessions=config.max_sessions,
+    max_sessions_per_client=config.max_sessions_per_client,
+    priorities=config.tool_priorities,
+)
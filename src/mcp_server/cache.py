@@ -0,0 +1,170 @@
+"""Shared result cache for pure MCP tools"""
+import asyncio
+import json
+import logging
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """How long results of a cacheable tool stay valid"""
+    ttl: float
+
+
+def make_key(tool: str, arguments: Optional[dict[str, Any]]) -> str:
+    """Cache key from the tool name and its arguments in canonical JSON form"""
+    args = json.dumps(arguments or {}, sort_keys=True, separators=(",", ":"), default=str)
+    return f"{tool}:{args}"
+
+
+class ToolCache:
+    """
+    Size-bounded LRU of tool results with per-tool TTL.
+
+    Concurrent calls with the same key share a single execution: the first
+    caller runs the tool and the others await its result. If that caller is
+    cancelled, a waiting caller runs the tool instead. Failed calls are
+    never cached.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._policies: dict[str, CachePolicy] = {}
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self._stats: dict[str, Counter] = {}
+        self._evictions = 0
+
+    def register(self, tool: str, ttl: float):
+        self._policies[tool] = CachePolicy(ttl)
+        logger.info(f"Caching results of tool '{tool}' for {ttl}s")
+
+    def policy(self, tool: str) -> Optional[CachePolicy]:
+        if not self.max_entries:
+            return None
+        return self._policies.get(tool)
+
+    def _count(self, tool: str, event: str):
+        self._stats.setdefault(tool, Counter())[event] += 1
+
+    def _lookup(self, key: str, tool: str) -> tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self._count(tool, "expired")
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def _store(self, key: str, value: Any, ttl: float):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    async def get_or_call(self, tool: str, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Return a cached result for key, or run call() once and cache its result"""
+        found, value = self._lookup(key, tool)
+        if found:
+            self._count(tool, "hits")
+            return value
+
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            self._count(tool, "coalesced")
+        while pending is not None:
+            # Unlike awaiting the future, wait() only raises if this caller is cancelled
+            await asyncio.wait({pending})
+            if not pending.cancelled():
+                return pending.result()
+            # The leading caller was cancelled; retry, taking over if nobody else has
+            found, value = self._lookup(key, tool)
+            if found:
+                return value
+            pending = self._in_flight.get(key)
+
+        self._count(tool, "misses")
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            value = await call()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so a call nobody else waited on doesn't warn
+            future.exception()
+            raise
+        else:
+            self._store(key, value, self._policies[tool].ttl)
+            future.set_result(value)
+            return value
+        finally:
+            del self._in_flight[key]
+
+    def stats(self) -> dict[str, Any]:
+        tools = {}
+        for tool, counts in self._stats.items():
+            lookups = counts["hits"] + counts["coalesced"] + counts["misses"]
+            tools[tool] = {
+                **counts,
+                "hit_rate": round((counts["hits"] + counts["coalesced"]) / lookups, 4) if lookups else 0.0,
+            }
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "evictions": self._evictions,
+            "tools": tools,
+        }
+
+
+tool_cache = ToolCache(max_entries=config.cache_max_entries)
+
+
+def cacheable(ttl: Optional[float] = None, name: Optional[str] = None):
+    """
+    Mark a tool as pure so identical calls are served from the shared cache.
+
+    Apply it below @mcp.tool() so it sees the plain function:
+
+        @mcp.tool()
+        @cacheable(ttl=60)
+        def lookup(key: str) -> str: ...
+
+    Args:
+        ttl: Seconds a result stays valid (default MCP_CACHE_DEFAULT_TTL)
+        name: Tool name, if registered under a name other than the function's
+    """
+    def decorator(fn):
+        tool_cache.register(name or fn.__name__, config.cache_default_ttl if ttl is None else ttl)
+        return fn
+    return decorator
+
+
+class CacheMiddleware(Middleware):
+    """FastMCP middleware that serves cacheable tool calls from a ToolCache"""
+
+    def __init__(self, cache: ToolCache):
+        self.cache = cache
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        tool = context.message.name
+        if self.cache.policy(tool) is None:
+            return await call_next(context)
+        key = make_key(tool, context.message.arguments)
+        return await self.cache.get_or_call(tool, key, lambda: call_next(context))
+
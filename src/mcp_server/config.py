@@ -8,6 +8,8 @@ class MCPConfig(BaseSettings):
     model_config = SettingsConfigDict(
         env_prefix="MCP_",
         env_file=".env",
+        # .env is shared with the agent, which has its own settings
+        extra="ignore",
         # env_file=".local.env",
     )
 
@@ -22,7 +24,37 @@ class MCPConfig(BaseSettings):
     # Data directory for file operations
     data_dir: Path = Path("/app/data")
 
-    # Feature flags
+    # Full-text search index over data_dir
+    search_index_file: str = ".search_index.json"
+    search_refresh_interval: float = 2.0
+    search_max_file_bytes: int = 2_000_000
+    search_save_delay: float = 5.0
+
+    # Admission control (0 disables a limit)
+    max_concurrent_calls: int = 32
+    max_calls_per_client: int = 8
+    max_queued_calls: int = 128
+    queue_timeout: float = 10.0
+    max_sessions: int = 256
+    max_sessions_per_client: int = 32
+    # Tool name -> priority class ("high", "normal" or "low")
+    tool_priorities: dict[str, str] = {}
+
+    # Shared cache for tools marked @cacheable (0 entries disables it)
+    cache_max_entries: int = 1024
+    cache_default_ttl: float = 300.0
+
+    # Admin endpoints (disabled unless a token is set)
+    admin_token: str = ""
+    # Runtime profiling results go to data_dir / profile_dir
+    profile_dir: str = "profiles"
+    profile_sample_interval: float = 0.005
+    profile_max_duration: float = 600.0
+
+    # Feature flags (one enable_<pack>_tools flag per built-in tool pack)
     enable_example_tools: bool = True
+    enable_search_tools: bool = True
+    # Names of other tool packs (e.g. from entry points) to skip
+    disabled_tool_packs: list[str] = []
 
 config = MCPConfig()
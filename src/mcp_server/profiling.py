@@ -0,0 +1,254 @@
+"""On-demand runtime profiling for the MCP server"""
+import asyncio
+import cProfile
+import hmac
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+from starlette.requests import Request
+
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ("cprofile", "sampling")
+
+# Characters allowed in result file names; anything else becomes "_"
+_UNSAFE_LABEL_RE = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+class ProfilerBusy(Exception):
+    """Raised when a profiling session is requested while another one runs"""
+
+
+class _Sampler(threading.Thread):
+    """Background thread that periodically records the stack of every other thread"""
+
+    def __init__(self, interval: float):
+        super().__init__(name="mcp-profile-sampler", daemon=True)
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.active = threading.Event()
+        self._stopped = threading.Event()
+
+    def run(self):
+        own = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            if not self.active.is_set():
+                continue
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
+class ProfileSession:
+    """One profiling run, either cProfile or stack sampling"""
+
+    def __init__(self, mode: str, label: str, sample_interval: float, tool: Optional[str] = None, calls: int = 0):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"mode must be one of {PROFILE_MODES}, got '{mode}'")
+        self.mode = mode
+        self.label = label
+        self.tool = tool
+        self.calls = calls
+        self.calls_done = 0
+        self.started_at = time.time()
+
+        self._profile = cProfile.Profile() if mode == "cprofile" else None
+        self._sampler = _Sampler(sample_interval) if mode == "sampling" else None
+        if self._sampler:
+            self._sampler.start()
+
+    def resume(self):
+        if self._profile:
+            self._profile.enable()
+        else:
+            self._sampler.active.set()
+
+    def pause(self):
+        if self._profile:
+            self._profile.disable()
+        else:
+            self._sampler.active.clear()
+
+    def finish(self, output_dir: Path) -> Path:
+        """Stop collecting and write the results to output_dir"""
+        self.pause()
+        if self._sampler:
+            self._sampler.stop()
+        output_dir.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started_at))
+        if self._profile:
+            path = output_dir / f"{stamp}-{self.label}.pstats"
+            self._profile.dump_stats(str(path))
+        else:
+            path = output_dir / f"{stamp}-{self.label}.collapsed"
+            with path.open("w", encoding="utf-8") as f:
+                for stack, count in self._sampler.stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+        return path
+
+    def describe(self) -> dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "label": self.label,
+            "tool": self.tool,
+            "calls": self.calls,
+            "calls_done": self.calls_done,
+            "running_for": round(time.time() - self.started_at, 2),
+        }
+
+
+class RuntimeProfiler:
+    """
+    Runs at most one profiling session at a time.
+
+    A session either covers a time window of everything on the server, or the
+    next N calls of a named tool. While no session targets a tool the only
+    per-call cost is one attribute comparison in ProfilingMiddleware.
+
+    cProfile only instruments the event loop thread. Sync tools run in a
+    worker thread pool and others hand work to asyncio.to_thread, so a
+    cProfile session would miss the tool body entirely; tool sessions
+    therefore require sampling, which records every thread.
+    """
+
+    def __init__(self, output_dir: Path, sample_interval: float = 0.005, max_duration: float = 600.0):
+        self.output_dir = Path(output_dir)
+        self.sample_interval = sample_interval
+        self.max_duration = max_duration
+        self.target_tool: Optional[str] = None
+        self.session: Optional[ProfileSession] = None
+        self._active_calls = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def start(self, mode: str, duration: float, tool: Optional[str] = None, calls: int = 1) -> dict[str, Any]:
+        """
+        Start a session; must be called from the server event loop.
+
+        Args:
+            mode: "cprofile" or "sampling"
+            duration: Window length, or how long to wait for the tool calls
+            tool: Profile only calls of this tool instead of a time window
+            calls: Number of tool calls to profile when tool is set
+        """
+        if self.session is not None:
+            raise ProfilerBusy("A profiling session is already running")
+        if not 0 < duration <= self.max_duration:
+            raise ValueError(f"duration must be between 0 and {self.max_duration} seconds")
+        if tool is not None and calls < 1:
+            raise ValueError("calls must be at least 1")
+        if tool is not None and mode == "cprofile":
+            raise ValueError(
+                "cprofile only sees the event loop thread, not the worker threads tool bodies "
+                "run in; use mode 'sampling' to profile a tool"
+            )
+
+        # The tool name comes from the client and ends up in a file name
+        label = f"{mode}-{_UNSAFE_LABEL_RE.sub('_', tool)}" if tool else f"{mode}-window"
+        self.session = ProfileSession(mode, label, self.sample_interval, tool=tool, calls=calls)
+        if tool is None:
+            self.session.resume()
+        else:
+            self.target_tool = tool
+        self._timer = asyncio.get_running_loop().call_later(duration, self.stop)
+        logger.info(f"Profiling started: {self.session.describe()}")
+        return self.session.describe()
+
+    def stop(self) -> Optional[Path]:
+        """Finish the running session, returning the result file (None if it couldn't be written)"""
+        session = self.session
+        if session is None:
+            return None
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self.session = None
+        self.target_tool = None
+        self._active_calls = 0
+        # Often runs in a tool call's finally block, which must not fail over this
+        try:
+            path = session.finish(self.output_dir)
+        except Exception:
+            logger.exception(f"Could not write profiling results to {self.output_dir}")
+            return None
+        logger.info(f"Profiling finished, results in {path}")
+        return path
+
+    async def profile_call(self, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Run a call of the targeted tool with the session collecting"""
+        session = self.session
+        if self._active_calls == 0:
+            session.resume()
+        self._active_calls += 1
+        try:
+            return await call()
+        finally:
+            if self.session is session:
+                self._active_calls -= 1
+                session.calls_done += 1
+                if self._active_calls == 0:
+                    session.pause()
+                    if session.calls_done >= session.calls:
+                        self.stop()
+
+    def status(self) -> dict[str, Any]:
+        results = []
+        if self.output_dir.is_dir():
+            files = sorted(self.output_dir.iterdir(), key=lambda p: p.stat().st_mtime, reverse=True)
+            results = [p.name for p in files[:20]]
+        return {
+            "active": self.session.describe() if self.session else None,
+            "output_dir": str(self.output_dir),
+            "results": results,
+        }
+
+
+class ProfilingMiddleware(Middleware):
+    """FastMCP middleware that hands calls of the targeted tool to the profiler"""
+
+    def __init__(self, profiler: RuntimeProfiler):
+        self.profiler = profiler
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        if self.profiler.target_tool != context.message.name:
+            return await call_next(context)
+        return await self.profiler.profile_call(lambda: call_next(context))
+
+
+def is_admin(request: Request) -> bool:
+    """Check the request carries the admin token; admin is off without one"""
+    if not config.admin_token:
+        return False
+    header = request.headers.get("authorization", "")
+    scheme, _, token = header.partition(" ")
+    return scheme.lower() == "bearer" and hmac.compare_digest(token, config.admin_token)
+
+
+profiler = RuntimeProfiler(
+    output_dir=config.data_dir / config.profile_dir,
+    sample_interval=config.profile_sample_interval,
+    max_duration=config.profile_max_duration,
+)
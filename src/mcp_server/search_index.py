@@ -0,0 +1,433 @@
+"""Incremental full-text search index over the MCP data directory"""
+import atexit
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+
+# BM25 tuning constants
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Cap on the line numbers kept per term per document, bounds index size
+MAX_LINES_PER_TERM = 8
+SNIPPET_CHARS = 200
+# Files indexed before their changes are published to queries
+REFRESH_BATCH = 500
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase alphanumeric tokens"""
+    return _TOKEN_RE.findall(text.lower())
+
+
+@dataclass
+class Document:
+    """Forward index entry for a single file"""
+    mtime_ns: int
+    size: int
+    length: int = 0
+    # term -> [term frequency, [line numbers...]]
+    terms: dict[str, list] = field(default_factory=dict)
+
+
+class SearchIndex:
+    """
+    Inverted index over the text files under a root directory.
+
+    The forward index (per-file terms and line numbers) is persisted to disk
+    as JSON; the inverted postings are rebuilt in memory on load. Files are
+    re-indexed only when their mtime or size changes, so a refresh costs one
+    stat per file rather than a full rebuild.
+
+    Saving is debounced onto a background thread: a refresh only marks the
+    index dirty, and at most one save runs every save_delay seconds. A save
+    lost on a crash only means the changed files are re-read on next start.
+
+    Refreshes run on a background thread (see start()), never on the query
+    path. Files are scanned and read without the lock and published to
+    queries in batches, so a search only ever waits for a short batch update.
+    Searches during the first build see partial results.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        index_path: Path,
+        refresh_interval: float = 2.0,
+        max_file_bytes: int = 2_000_000,
+        exclude_dirs: tuple[str, ...] = (),
+        save_delay: float = 5.0,
+    ):
+        self.root = Path(root)
+        self.exclude_dirs = {self.root / name for name in exclude_dirs}
+        self.index_path = Path(index_path)
+        self.refresh_interval = refresh_interval
+        self.max_file_bytes = max_file_bytes
+        self.save_delay = save_delay
+
+        self._docs: dict[str, Document] = {}
+        self._postings: dict[str, set[str]] = {}
+        self._total_length = 0
+        self._last_refresh = 0.0
+        # Unreadable and binary files, so they aren't re-read on every refresh
+        self._skipped: dict[str, tuple[int, int]] = {}
+        self._dirty = False
+        self._save_timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        # Serializes refreshes; only a refresh mutates _docs, so it may read them unlocked
+        self._refresh_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Held for a whole save so snapshots are written in the order taken
+        self._save_lock = threading.Lock()
+
+        self._load()
+
+    # Persistence
+
+    def _load(self):
+        """Load the persisted forward index, if any"""
+        if not self.index_path.is_file():
+            return
+        try:
+            with self.index_path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable search index {self.index_path}: {e}")
+            return
+        if data.get("version") != INDEX_VERSION:
+            logger.info("Search index version changed, rebuilding")
+            return
+        for path, (mtime_ns, size, length, terms) in data.get("docs", {}).items():
+            self._add(path, Document(mtime_ns, size, length, terms))
+        logger.info(f"Loaded search index with {len(self._docs)} documents")
+
+    def _schedule_save(self):
+        """Save in the background after save_delay, unless a save is already pending"""
+        if self._save_timer is None:
+            self._save_timer = threading.Timer(self.save_delay, self._save)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def _save(self):
+        """Atomically write the forward index to disk"""
+        with self._save_lock:
+            # Documents are replaced on re-index, never mutated, so a shallow
+            # copy is a consistent snapshot and serializing it needs no lock
+            with self._lock:
+                self._save_timer = None
+                if not self._dirty:
+                    return
+                docs = list(self._docs.items())
+                self._dirty = False
+
+            data = {
+                "version": INDEX_VERSION,
+                "docs": {
+                    path: [doc.mtime_ns, doc.size, doc.length, doc.terms]
+                    for path, doc in docs
+                },
+            }
+            tmp_path = self.index_path.with_name(self.index_path.name + ".tmp")
+            try:
+                self.index_path.parent.mkdir(parents=True, exist_ok=True)
+                with tmp_path.open("w", encoding="utf-8") as f:
+                    json.dump(data, f, separators=(",", ":"))
+                os.replace(tmp_path, self.index_path)
+            except OSError as e:
+                logger.warning(f"Could not persist search index to {self.index_path}: {e}")
+                with self._lock:
+                    self._dirty = True
+
+    def flush(self):
+        """Write any pending changes to disk now"""
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+        self._save()
+
+    # Index maintenance
+
+    def _add(self, path: str, doc: Document):
+        self._docs[path] = doc
+        self._total_length += doc.length
+        for term in doc.terms:
+            self._postings.setdefault(term, set()).add(path)
+
+    def _remove(self, path: str):
+        doc = self._docs.pop(path, None)
+        if doc is None:
+            return
+        self._total_length -= doc.length
+        for term in doc.terms:
+            paths = self._postings.get(term)
+            if paths is not None:
+                paths.discard(path)
+                if not paths:
+                    del self._postings[term]
+
+    def _scan(self) -> dict[str, os.stat_result]:
+        """Stat every candidate file under the root, skipping hidden and excluded entries"""
+        found: dict[str, os.stat_result] = {}
+        stack = [self.root]
+        while stack:
+            directory = stack.pop()
+            try:
+                entries = os.scandir(directory)
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.name.startswith("."):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if Path(entry.path) not in self.exclude_dirs:
+                                stack.append(Path(entry.path))
+                        elif entry.is_file(follow_symlinks=False):
+                            stat = entry.stat(follow_symlinks=False)
+                            if stat.st_size <= self.max_file_bytes:
+                                rel = Path(entry.path).relative_to(self.root).as_posix()
+                                found[rel] = stat
+                    except OSError:
+                        continue
+        return found
+
+    def _index_file(self, path: str, stat: os.stat_result) -> Optional[Document]:
+        """Build the forward index entry for a file, None if it isn't text"""
+        try:
+            raw = (self.root / path).read_bytes()
+        except OSError:
+            return None
+        if b"\x00" in raw[:8192]:
+            return None
+        text = raw.decode("utf-8", errors="replace")
+
+        # Lines end at "\n" only, the same rule _snippet reads them back with
+        doc = Document(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+        for line_no, line in enumerate(text.split("\n"), start=1):
+            for term in tokenize(line):
+                doc.length += 1
+                entry = doc.terms.get(term)
+                if entry is None:
+                    doc.terms[term] = [1, [line_no]]
+                    continue
+                entry[0] += 1
+                lines = entry[1]
+                if lines[-1] != line_no and len(lines) < MAX_LINES_PER_TERM:
+                    lines.append(line_no)
+        return doc
+
+    def refresh(self, force: bool = False) -> int:
+        """
+        Bring the index up to date with the files on disk.
+
+        Only files whose mtime or size changed are re-read. Calls within
+        refresh_interval of the previous refresh are skipped unless forced.
+
+        Returns:
+            Number of documents added, updated or removed
+        """
+        with self._refresh_lock:
+            now = time.monotonic()
+            if not force and now - self._last_refresh < self.refresh_interval:
+                return 0
+            self._last_refresh = now
+
+            found = self._scan()
+            removed = [path for path in self._docs if path not in found]
+            stale = []
+            for path, stat in found.items():
+                key = (stat.st_mtime_ns, stat.st_size)
+                doc = self._docs.get(path)
+                if doc is not None and (doc.mtime_ns, doc.size) == key:
+                    continue
+                if doc is None and self._skipped.get(path) == key:
+                    continue
+                stale.append((path, stat))
+            self._skipped = {path: key for path, key in self._skipped.items() if path in found}
+
+            with self._lock:
+                for path in removed:
+                    self._remove(path)
+            for i in range(0, len(stale), REFRESH_BATCH):
+                batch = [(path, stat, self._index_file(path, stat)) for path, stat in stale[i:i + REFRESH_BATCH]]
+                with self._lock:
+                    for path, _, doc in batch:
+                        self._remove(path)
+                        if doc is not None:
+                            self._add(path, doc)
+                for path, stat, doc in batch:
+                    if doc is None:
+                        self._skipped[path] = (stat.st_mtime_ns, stat.st_size)
+
+            changed = len(removed) + len(stale)
+            with self._lock:
+                if changed:
+                    self._dirty = True
+                    logger.info(f"Search index refreshed: {changed} documents changed")
+                if self._dirty:
+                    self._schedule_save()
+            self._ready.set()
+            return changed
+
+    def _refresh_loop(self):
+        while not self._stopped.is_set():
+            try:
+                self.refresh(force=True)
+            except Exception:
+                logger.exception("Search index refresh failed")
+            self._stopped.wait(self.refresh_interval)
+
+    def start(self):
+        """Keep the index up to date from a background thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._refresh_loop, name="search-index-refresh", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the background refresh and write any pending changes"""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    @property
+    def ready(self) -> bool:
+        """Whether a full refresh has completed since the index was created"""
+        return self._ready.is_set()
+
+    # Querying
+
+    def _snippet(self, path: str, line_no: int, terms: list[str]) -> tuple[str, int]:
+        """Read a single line back from disk and locate the first match in it"""
+        try:
+            with (self.root / path).open("r", encoding="utf-8", errors="replace", newline="\n") as f:
+                for current, line in enumerate(f, start=1):
+                    if current == line_no:
+                        break
+                else:
+                    return "", 0
+        except OSError:
+            return "", 0
+
+        line = line.rstrip("\r\n")
+        # Match whole tokens, as indexed, rather than substrings of other words
+        wanted = set(terms)
+        column = next(
+            (m.start() for m in _TOKEN_RE.finditer(line.lower()) if m.group() in wanted),
+            0,
+        )
+        start = max(0, column - SNIPPET_CHARS // 4)
+        snippet = line[start:start + SNIPPET_CHARS].strip()
+        return snippet, column
+
+    def search(self, query: str, limit: int = 10) -> list[dict[str, Any]]:
+        """
+        Rank documents against a query with BM25.
+
+        Reads the index as it is; start() or refresh() keep it up to date.
+
+        Returns:
+            List of results with path, score, 1-based line, 0-based column
+            and a snippet of the best matching line
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        with self._lock:
+            n_docs = len(self._docs)
+            if n_docs == 0:
+                return []
+            avg_length = self._total_length / n_docs or 1.0
+
+            scores: dict[str, float] = {}
+            for term in terms:
+                paths = self._postings.get(term)
+                if not paths:
+                    continue
+                idf = math.log(1 + (n_docs - len(paths) + 0.5) / (len(paths) + 0.5))
+                for path in paths:
+                    doc = self._docs[path]
+                    tf = doc.terms[term][0]
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * doc.length / avg_length)
+                    scores[path] = scores.get(path, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+            # Pick the line that matches the most query terms in each hit
+            hits = []
+            for path, score in ranked:
+                doc = self._docs[path]
+                line_hits: dict[int, int] = {}
+                for term in terms:
+                    entry = doc.terms.get(term)
+                    if entry:
+                        for line_no in entry[1]:
+                            line_hits[line_no] = line_hits.get(line_no, 0) + 1
+                best_line = min(line_hits, key=lambda n: (-line_hits[n], n))
+                hits.append((path, score, best_line))
+
+        results = []
+        for path, score, line_no in hits:
+            snippet, column = self._snippet(path, line_no, terms)
+            results.append({
+                "path": path,
+                "score": round(score, 4),
+                "line": line_no,
+                "column": column,
+                "snippet": snippet,
+            })
+        return results
+
+    def stats(self) -> dict[str, Any]:
+        """Summary of the index contents"""
+        with self._lock:
+            return {
+                "documents": len(self._docs),
+                "terms": len(self._postings),
+                "tokens": self._total_length,
+                "ready": self.ready,
+            }
+
+
+_index: Optional[SearchIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> SearchIndex:
+    """Get the shared search index for the configured data directory"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = SearchIndex(
+                root=config.data_dir,
+                index_path=config.data_dir / config.search_index_file,
+                refresh_interval=config.search_refresh_interval,
+                max_file_bytes=config.search_max_file_bytes,
+                # Profiling output is not content worth searching
+                exclude_dirs=(config.profile_dir,),
+                save_delay=config.search_save_delay,
+            )
+            _index.start()
+            atexit.register(_index.stop)
+        return _index
@@ -1,8 +1,13 @@
 """The Hive MCP Server - Main server implementation"""
 from fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import JSONResponse
 import logging
 
 from .config import config
+from .admission import AdmissionMiddleware, admission
+from .cache import CacheMiddleware, tool_cache
+from .profiling import ProfilerBusy, ProfilingMiddleware, is_admin, profiler
 
 # Configure logging
 logging.basicConfig(
@@ -17,9 +22,65 @@ mcp = FastMCP(
     version=config.version,
 )
 
-# Import tools to register them via decorators
+# Serve cache hits first so they never wait for an admission slot,
+# then bound concurrent tool calls before anything else runs
+mcp.add_middleware(CacheMiddleware(tool_cache))
+mcp.add_middleware(AdmissionMiddleware(admission))
+mcp.add_middleware(ProfilingMiddleware(profiler))
+
+@mcp.custom_route("/stats/admission", methods=["GET"])
+async def admission_stats(request: Request) -> JSONResponse:
+    """Queue depth, in-flight calls and shed counts"""
+    return JSONResponse(admission.stats())
+
+@mcp.custom_route("/stats/cache", methods=["GET"])
+async def cache_stats(request: Request) -> JSONResponse:
+    """Entry count, evictions and per-tool hit rates"""
+    return JSONResponse(tool_cache.stats())
+
+@mcp.custom_route("/admin/profile", methods=["GET", "POST", "DELETE"])
+async def admin_profile(request: Request) -> JSONResponse:
+    """
+    Control runtime profiling (requires MCP_ADMIN_TOKEN as a bearer token).
+
+    GET shows the running session and recent results, DELETE stops the
+    running session early, and POST starts one from a JSON body:
+    {"mode": "cprofile" | "sampling", "duration": seconds,
+     "tool": optional tool name, "calls": tool calls to profile}
+    Tool sessions must use (and default to) sampling.
+    """
+    if not is_admin(request):
+        return JSONResponse({"error": "not found"}, status_code=404)
+
+    if request.method == "GET":
+        return JSONResponse(profiler.status())
+
+    if request.method == "DELETE":
+        running = profiler.session is not None
+        path = profiler.stop()
+        return JSONResponse({"stopped": running, "result": path.name if path else None})
+
+    try:
+        body = await request.json()
+        tool = body.get("tool")
+        session = profiler.start(
+            # Tool bodies run in worker threads, which only sampling sees
+            mode=body.get("mode", "sampling" if tool else "cprofile"),
+            duration=float(body.get("duration", 30)),
+            tool=tool,
+            calls=int(body.get("calls", 1)),
+        )
+    except ProfilerBusy as e:
+        return JSONResponse({"error": str(e)}, status_code=409)
+    except (ValueError, TypeError, AttributeError) as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    return JSONResponse({"started": session})
+
+# Load enabled tool packs to register them via decorators
 # This must happen AFTER mcp instance is created
-from . import tools  # noqa: F401, E402
+from .tools import load_tool_packs  # noqa: E402
+
+load_tool_packs()
 
 def get_server():
     """Factory function to get the MCP server instance"""
@@ -1,16 +1,17 @@
 """
 MCP Tools Package
 
-Import all tool modules here to register them with the MCP server.
-Add your custom tool modules to this list as you create them.
+Tool modules are loaded through the registry in registry.py, which honors the
+per-pack enable flags from config. Add your custom tool modules to
+BUILTIN_PACKS there, or ship them in a separate package that advertises a
+"the_hive.mcp_tools" entry point.
 """
-
-# Import to register tools (don't remove even if IDE says unused)
-from . import example_tools  # Example tools to demonstrate functionality
-# from . import tool_template  # Uncomment to include template examples
-# from . import my_custom_tools  # Add your custom tools here
+from .registry import ToolPack, discover_packs, is_enabled, lazy, load_tool_packs
 
 __all__ = [
-    "example_tools",
-    # Add your custom tool modules here
+    "ToolPack",
+    "discover_packs",
+    "is_enabled",
+    "lazy",
+    "load_tool_packs",
 ]
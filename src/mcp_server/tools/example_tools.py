@@ -2,6 +2,7 @@
 from typing import Any
 from ..server import mcp
 from ..config import config
+from ..cache import cacheable
 
 @mcp.tool()
 def echo(message: str) -> dict[str, Any]:
@@ -22,6 +23,7 @@ def echo(message: str) -> dict[str, Any]:
     }
 
 @mcp.tool()
+@cacheable()
 def add(a: float, b: float) -> float:
     """
     Add two numbers together.
@@ -36,6 +38,7 @@ def add(a: float, b: float) -> float:
     return a + b
 
 @mcp.tool()
+@cacheable()
 def multiply(a: float, b: float) -> float:
     """
     Multiply two numbers.
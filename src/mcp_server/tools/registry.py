@@ -0,0 +1,152 @@
+"""
+Tool pack registry
+
+A tool pack is a module whose @mcp.tool() functions are registered when the
+module is imported. Packs are discovered from the built-in manifest below and
+from the "the_hive.mcp_tools" entry point group, and only imported when their
+enable flag is on. Pack modules should stay cheap to import: keep heavy
+dependencies behind lazy() so they load on the first tool call instead of at
+server start.
+"""
+import importlib
+import logging
+import os
+import re
+from dataclasses import dataclass
+from importlib.metadata import entry_points
+from typing import Any, Callable, Optional
+
+from dotenv import dotenv_values
+
+from ..config import config
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = "the_hive.mcp_tools"
+
+_TRUE_VALUES = {"1", "true", "yes", "on"}
+_FALSE_VALUES = {"0", "false", "no", "off"}
+
+
+@dataclass(frozen=True)
+class ToolPack:
+    """A module of MCP tools that can be enabled or disabled as a unit"""
+    name: str
+    module: str
+    description: str = ""
+
+
+# Built-in tool packs. Add your custom tool modules here.
+BUILTIN_PACKS = [
+    ToolPack("example", f"{__package__}.example_tools", "Example tools (echo, add, multiply)"),
+    ToolPack("search", f"{__package__}.search_tools", "Full-text search over the data directory"),
+    # ToolPack("template", f"{__package__}.tool_template", "Template examples"),
+]
+
+
+def discover_packs() -> list[ToolPack]:
+    """List built-in packs followed by packs advertised through entry points"""
+    packs = list(BUILTIN_PACKS)
+    known = {pack.name for pack in packs}
+    for ep in entry_points(group=ENTRY_POINT_GROUP):
+        if ep.name in known:
+            logger.warning(f"Ignoring duplicate tool pack '{ep.name}' from {ep.value}")
+            continue
+        packs.append(ToolPack(ep.name, ep.module, f"Entry point {ep.value}"))
+        known.add(ep.name)
+    return packs
+
+
+def _env_flag(pack: ToolPack) -> Optional[bool]:
+    """
+    Read MCP_ENABLE_<NAME>_TOOLS for a pack without a config field.
+
+    MCPConfig drops unknown keys, so flags of entry point packs are looked up
+    in the environment and then the .env file directly.
+    """
+    name = "MCP_ENABLE_" + re.sub(r"[^A-Z0-9]", "_", pack.name.upper()) + "_TOOLS"
+    value = os.environ.get(name)
+    if value is None:
+        env_file = config.model_config.get("env_file")
+        if env_file and os.path.isfile(env_file):
+            value = dotenv_values(env_file).get(name)
+    if value is None:
+        return None
+    normalized = value.strip().lower()
+    if normalized in _TRUE_VALUES:
+        return True
+    if normalized in _FALSE_VALUES:
+        return False
+    raise ValueError(f"{name} must be a boolean, got '{value}'")
+
+
+def is_enabled(pack: ToolPack) -> bool:
+    """
+    Check whether a pack is enabled.
+
+    An explicit MCP_ENABLE_<NAME>_TOOLS flag wins, for built-in and entry
+    point packs alike; otherwise the pack is enabled unless it is listed in
+    MCP_DISABLED_TOOL_PACKS.
+    """
+    flag = getattr(config, f"enable_{pack.name}_tools", None)
+    if flag is None:
+        flag = _env_flag(pack)
+    if flag is not None:
+        return bool(flag)
+    return pack.name not in config.disabled_tool_packs
+
+
+def load_tool_packs() -> list[str]:
+    """
+    Import every enabled tool pack so its tools register with the server.
+
+    Returns:
+        Names of the packs that were loaded
+    """
+    loaded = []
+    for pack in discover_packs():
+        if not is_enabled(pack):
+            logger.info(f"Tool pack '{pack.name}' disabled, skipping")
+            continue
+        try:
+            importlib.import_module(pack.module)
+        except Exception:
+            logger.exception(f"Failed to load tool pack '{pack.name}' from {pack.module}")
+            continue
+        loaded.append(pack.name)
+    logger.info(f"Loaded tool packs: {loaded}")
+    return loaded
+
+
+def lazy(target: str, package: Optional[str] = None) -> Callable[..., Any]:
+    """
+    Defer importing a tool implementation until it is first called.
+
+    Args:
+        target: "module:attribute" path, relative paths need package
+        package: Anchor for relative module paths (usually __package__)
+
+    Returns:
+        Callable that imports the target on first use and forwards to it
+
+    Example:
+        render = lazy("..impl.charts:render", __package__)
+
+        @mcp.tool()
+        def plot(data: list[float]) -> str:
+            return render(data)
+    """
+    module_name, _, attr = target.partition(":")
+    if not attr:
+        raise ValueError(f"lazy target must look like 'module:attribute', got '{target}'")
+    resolved: list[Callable[..., Any]] = []
+
+    def call(*args, **kwargs):
+        if not resolved:
+            module = importlib.import_module(module_name, package)
+            resolved.append(getattr(module, attr))
+        return resolved[0](*args, **kwargs)
+
+    call.__name__ = attr
+    call.__qualname__ = attr
+    return call
@@ -0,0 +1,44 @@
+"""Full-text search tools over the MCP data directory"""
+import asyncio
+from typing import Any
+from ..server import mcp
+from .registry import lazy
+
+# The index is only imported and loaded from disk on the first search
+get_index = lazy("..search_index:get_index", __package__)
+
+@mcp.tool()
+async def search_files(query: str, limit: int = 10) -> dict[str, Any]:
+    """
+    Search the text files in the server data directory.
+
+    Use this instead of reading files one by one to find where something is
+    mentioned. Results are ranked by relevance and point at the best matching
+    line in each file, so a follow-up read can go straight to it.
+
+    Args:
+        query: Words to search for (case-insensitive, any order)
+        limit: Maximum number of files to return (default 10)
+
+    Returns:
+        Dictionary with ranked results; each has the file path relative to the
+        data directory, score, 1-based line number, column and a snippet.
+        index_ready is false while the first index build is still running,
+        in which case results may be incomplete
+    """
+    if not query.strip():
+        raise ValueError("query cannot be empty")
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+
+    # Loading the index and reading snippets touch the disk, so keep them
+    # off the event loop that serves every other session
+    index = await asyncio.to_thread(get_index)
+    results = await asyncio.to_thread(index.search, query, limit)
+    return {
+        "status": "success",
+        "query": query,
+        "count": len(results),
+        "results": results,
+        "index_ready": index.ready,
+    }
@@ -4,17 +4,27 @@ Template for creating custom MCP tools
 INSTRUCTIONS:
 1. Copy this file to a new name (e.g., my_tools.py)
 2. Modify the functions below with your custom logic
-3. Import your module in tools/__init__.py
+3. Add a ToolPack for your module to BUILTIN_PACKS in tools/registry.py
+   (toggle it with MCP_ENABLE_<NAME>_TOOLS or MCP_DISABLED_TOOL_PACKS)
 4. Restart the MCP server
 
 The @mcp.tool() decorator automatically:
 - Registers the tool with the MCP server
 - Generates JSON schema from type hints
 - Exposes the tool to AI agents
+
+Keep the module cheap to import: it is imported at server start whenever the
+pack is enabled. Load heavy dependencies with lazy() so they are only paid
+for on the first call.
 """
 from typing import Any
 from ..server import mcp
 from ..config import config
+from ..cache import cacheable  # noqa: F401
+from .registry import lazy  # noqa: F401
+
+# Heavy implementations are imported on first call, e.g.:
+# summarize = lazy("..impl.nlp:summarize", __package__)
 
 @mcp.tool()
 def custom_tool_example(
@@ -74,6 +84,9 @@ async def async_tool_example(data: str) -> str:
 
     return f"Async processed: {data}"
 
+# Pure tools (same arguments always give the same result) can opt into the
+# shared result cache by adding @cacheable(ttl=...) below @mcp.tool()
+
 # Add more tool functions below using the same pattern
 # Each function decorated with @mcp.tool() will be automatically
 # discovered and made available to AI agents
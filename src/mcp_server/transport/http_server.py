@@ -1,7 +1,9 @@
 """SSE transport for MCP server"""
 import logging
+from starlette.middleware import Middleware
 from ..server import get_server
 from ..config import config
+from ..admission import SessionLimitMiddleware, admission
 
 logger = logging.getLogger(__name__)
 
@@ -14,10 +16,12 @@ def main():
 
     # Run FastMCP with SSE transport
     # This provides standard MCP SSE protocol compatible with mcp.client.sse
+    # Session limits are enforced in front of the SSE endpoint
     mcp_server.run(
         transport="sse",
         host=config.host,
-        port=config.port
+        port=config.port,
+        middleware=[Middleware(SessionLimitMiddleware, controller=admission)],
     )
 
 if __name__ == "__main__":
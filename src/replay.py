@@ -0,0 +1,470 @@
+"""
+Record/replay harness for offline agent performance testing
+
+In record mode the model, MCP client and local tools are wrapped so that
+every streamed model event (with its timing), every tool result and every
+user prompt is appended to a trace file. In replay mode local stand-ins serve
+the trace back at recorded or accelerated speed, so an agent turn can be
+benchmarked with no Ollama, no MCP server, no network and no side effects on
+the host. Only HIVE_REPLAY_LIVE_TOOLS (piper_speak by default) still run, so
+the TTS overhead is part of the measurement; piper_speak synthesizes speech
+with the voice from PIPER_VOICE but writes the audio to a null sink.
+
+Record:
+    HIVE_TRACE_MODE=record HIVE_TRACE_FILE=trace.jsonl.gz poetry run python -i src/main.py
+
+Replay and benchmark (speed 0 skips all recorded waits):
+    poetry run python src/replay.py trace.jsonl.gz --speed 0
+"""
+import argparse
+import asyncio
+import base64
+import gzip
+import json
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Any, AsyncGenerator, Optional
+
+from strands.hooks import (
+    AfterToolCallEvent,
+    BeforeInvocationEvent,
+    BeforeToolCallEvent,
+    HookProvider,
+    HookRegistry,
+)
+from strands.models import Model
+from strands.types.tools import AgentTool
+
+logger = logging.getLogger(__name__)
+
+TRACE_VERSION = 1
+
+
+def _encode(value: Any) -> Any:
+    """JSON fallback for the bytes found in image/document content blocks"""
+    if isinstance(value, (bytes, bytearray)):
+        return {"__bytes__": base64.b64encode(value).decode("ascii")}
+    raise TypeError(f"Cannot serialize {type(value).__name__} in trace")
+
+
+def _decode(obj: dict[str, Any]) -> Any:
+    if len(obj) == 1 and "__bytes__" in obj:
+        return base64.b64decode(obj["__bytes__"])
+    return obj
+
+
+def _tool_key(name: str, tool_input: Any) -> str:
+    return f"{name}:{json.dumps(tool_input, sort_keys=True, default=str)}"
+
+
+def _open(path: Path, mode: str):
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return path.open(mode, encoding="utf-8")
+
+
+def _read_records(path: Path):
+    """Yield the records of a trace, stopping at a tail cut off by a crash"""
+    with _open(path, "r") as f:
+        try:
+            for line in f:
+                if not line.endswith("\n"):
+                    logger.warning(f"Ignoring incomplete last record in {path}")
+                    return
+                yield json.loads(line, object_hook=_decode)
+        except EOFError:
+            # A gzip stream whose writer was never closed has no end marker
+            logger.warning(f"Trace {path} was not closed cleanly, read up to where it ends")
+
+
+class TraceWriter:
+    """Appends trace records as compact JSON lines"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = _open(self.path, "w")
+        self._lock = threading.Lock()
+        self.write({"type": "header", "version": TRACE_VERSION, "created": time.time()})
+
+    def write(self, record: dict[str, Any]):
+        line = json.dumps(record, separators=(",", ":"), default=_encode)
+        with self._lock:
+            if self._file.closed:
+                logger.warning(f"Dropping {record['type']} record, trace {self.path} is closed")
+                return
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        """Close the file; for .gz traces this writes the end-of-stream marker"""
+        with self._lock:
+            self._file.close()
+
+
+class Trace:
+    """A loaded trace: prompts, model turns in order and tool results by call"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.prompts: list[str] = []
+        self.model_turns: deque[list[tuple[float, dict]]] = deque()
+        self.structured_turns: deque[tuple[str, list[tuple[float, dict]]]] = deque()
+        self.tool_specs: list[dict[str, Any]] = []
+        self.tool_results: dict[str, deque] = defaultdict(deque)
+        self._by_name: dict[str, deque] = defaultdict(deque)
+
+        for record in _read_records(self.path):
+            kind = record["type"]
+            if kind == "header" and record.get("version") != TRACE_VERSION:
+                raise ValueError(f"Unsupported trace version {record.get('version')} in {self.path}")
+            elif kind == "prompt":
+                self.prompts.append(record["text"])
+            elif kind == "model":
+                self.model_turns.append([(delay, event) for delay, event in record["events"]])
+            elif kind == "structured":
+                events = [(delay, event) for delay, event in record["events"]]
+                self.structured_turns.append((record["output_model"], events))
+            elif kind == "tools":
+                self.tool_specs = record["specs"]
+            elif kind == "tool":
+                entry = (record["duration"], record["result"])
+                self.tool_results[_tool_key(record["name"], record["input"])].append(entry)
+                self._by_name[record["name"]].append(entry)
+
+    def next_model_turn(self) -> list[tuple[float, dict]]:
+        if not self.model_turns:
+            raise RuntimeError(f"Trace {self.path} has no more recorded model responses")
+        return self.model_turns.popleft()
+
+    def next_structured_turn(self, output_model: str) -> list[tuple[float, dict]]:
+        if not self.structured_turns:
+            raise RuntimeError(
+                f"Trace {self.path} has no more recorded structured output calls "
+                f"(structured_output for '{output_model}' was not called while recording)"
+            )
+        recorded_model, events = self.structured_turns.popleft()
+        if recorded_model != output_model:
+            raise RuntimeError(
+                f"Trace {self.path} recorded structured output for '{recorded_model}' "
+                f"where replay asked for '{output_model}'"
+            )
+        return events
+
+    def tool_result(self, name: str, tool_input: Any) -> Optional[tuple[float, dict]]:
+        """Recorded result for an identical call, else the next one for the tool"""
+        exact = self.tool_results.get(_tool_key(name, tool_input))
+        if exact:
+            return exact.popleft()
+        by_name = self._by_name.get(name)
+        if by_name:
+            return by_name.popleft()
+        return None
+
+
+# Recording
+
+
+class RecordingModel(Model):
+    """Wraps a model and records every streamed event with its delay"""
+
+    def __init__(self, model: Model, writer: TraceWriter):
+        self.model = model
+        self.writer = writer
+
+    def update_config(self, **model_config: Any) -> None:
+        self.model.update_config(**model_config)
+
+    def get_config(self) -> Any:
+        return self.model.get_config()
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        events = []
+        last = time.monotonic()
+        try:
+            async for event in self.model.structured_output(output_model, prompt, system_prompt=system_prompt, **kwargs):
+                now = time.monotonic()
+                # The final event holds a pydantic instance, stored as plain data
+                if "output" in event:
+                    recorded = {**event, "output": event["output"].model_dump(mode="json")}
+                else:
+                    recorded = event
+                events.append([round(now - last, 6), recorded])
+                last = now
+                yield event
+        finally:
+            self.writer.write({"type": "structured", "output_model": output_model.__name__, "events": events})
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs) -> AsyncGenerator[Any, None]:
+        events = []
+        last = time.monotonic()
+        try:
+            async for event in self.model.stream(messages, tool_specs, system_prompt, **kwargs):
+                now = time.monotonic()
+                events.append([round(now - last, 6), event])
+                last = now
+                yield event
+        finally:
+            self.writer.write({"type": "model", "events": events})
+
+
+class RecordingTool(AgentTool):
+    """Wraps a tool and records its final result and duration"""
+
+    def __init__(self, tool: AgentTool, writer: TraceWriter):
+        super().__init__()
+        self.tool = tool
+        self.writer = writer
+
+    @property
+    def tool_name(self) -> str:
+        return self.tool.tool_name
+
+    @property
+    def tool_spec(self):
+        return self.tool.tool_spec
+
+    @property
+    def tool_type(self) -> str:
+        return self.tool.tool_type
+
+    async def stream(self, tool_use, invocation_state, **kwargs):
+        start = time.monotonic()
+        async for event in self.tool.stream(tool_use, invocation_state, **kwargs):
+            # The executor stops iterating at the result, so record it before yielding
+            result = getattr(event, "tool_result", None)
+            if result is None and isinstance(event, dict) and "toolUseId" in event and "status" in event:
+                result = event
+            if result is not None:
+                self.writer.write({
+                    "type": "tool",
+                    "name": self.tool_name,
+                    "input": tool_use["input"],
+                    "duration": round(time.monotonic() - start, 6),
+                    "result": result,
+                })
+            yield event
+
+
+class RecordingMCPClient:
+    """Wraps an MCPClient so the tools it lists record their results"""
+
+    def __init__(self, client: Any, writer: TraceWriter):
+        self.client = client
+        self.writer = writer
+
+    def __enter__(self):
+        self.client.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self.client.__exit__(*exc_info)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.client, name)
+
+    def list_tools_sync(self, *args, **kwargs) -> list[AgentTool]:
+        tools = self.client.list_tools_sync(*args, **kwargs)
+        self.writer.write({"type": "tools", "specs": [tool.tool_spec for tool in tools]})
+        return [RecordingTool(tool, self.writer) for tool in tools]
+
+
+class TraceHooks(HookProvider):
+    """Records each user prompt so replays can drive the same turns"""
+
+    def __init__(self, writer: TraceWriter):
+        self.writer = writer
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(BeforeInvocationEvent, self._on_invocation)
+
+    def _on_invocation(self, event: BeforeInvocationEvent):
+        text = " ".join(
+            block["text"]
+            for message in event.messages or [] if message.get("role") == "user"
+            for block in message.get("content", []) if "text" in block
+        )
+        # Structured output calls invoke the agent without new user text; they
+        # are replayed from their own records, not as turns
+        if text:
+            self.writer.write({"type": "prompt", "text": text})
+
+
+# Replay
+
+
+class ReplayModel(Model):
+    """Serves recorded model turns back in order"""
+
+    def __init__(self, trace: Trace, speed: float = 1.0):
+        self.trace = trace
+        self.speed = speed
+        self.waited = 0.0
+        self.config: dict[str, Any] = {"model_id": "replay"}
+
+    def update_config(self, **model_config: Any) -> None:
+        self.config.update(model_config)
+
+    def get_config(self) -> Any:
+        return self.config
+
+    async def _play(self, events: list[tuple[float, dict]]) -> AsyncGenerator[dict, None]:
+        for delay, event in events:
+            if self.speed and delay:
+                wait = delay / self.speed
+                self.waited += wait
+                await asyncio.sleep(wait)
+            yield event
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        async for event in self._play(self.trace.next_structured_turn(output_model.__name__)):
+            if "output" in event:
+                event = {**event, "output": output_model.model_validate(event["output"])}
+            yield event
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs) -> AsyncGenerator[Any, None]:
+        async for event in self._play(self.trace.next_model_turn()):
+            yield event
+
+
+class ReplayTool(AgentTool):
+    """Stand-in for an MCP or local tool that returns recorded results"""
+
+    def __init__(self, spec: dict[str, Any], trace: Trace, speed: float = 1.0):
+        super().__init__()
+        self.spec = spec
+        self.trace = trace
+        self.speed = speed
+        self.waited = 0.0
+
+    @property
+    def tool_name(self) -> str:
+        return self.spec["name"]
+
+    @property
+    def tool_spec(self):
+        return self.spec
+
+    @property
+    def tool_type(self) -> str:
+        return "replay"
+
+    async def stream(self, tool_use, invocation_state, **kwargs):
+        recorded = self.trace.tool_result(self.tool_name, tool_use["input"])
+        if recorded is None:
+            yield {
+                "toolUseId": tool_use["toolUseId"],
+                "status": "error",
+                "content": [{"text": f"No recorded result for tool '{self.tool_name}'"}],
+            }
+            return
+        duration, result = recorded
+        if self.speed and duration:
+            wait = duration / self.speed
+            self.waited += wait
+            await asyncio.sleep(wait)
+        yield {**result, "toolUseId": tool_use["toolUseId"]}
+
+
+class ReplayMCPClient:
+    """Stand-in for MCPClient that lists the recorded tools"""
+
+    def __init__(self, trace: Trace, speed: float = 1.0):
+        self.trace = trace
+        self.speed = speed
+        self.tools: list[ReplayTool] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return None
+
+    def start(self):
+        return self
+
+    def stop(self, *exc_info):
+        return None
+
+    def list_tools_sync(self, *args, **kwargs) -> list[AgentTool]:
+        self.tools = [ReplayTool(spec, self.trace, self.speed) for spec in self.trace.tool_specs]
+        return self.tools
+
+
+# Benchmark runner
+
+
+class ToolTimer(HookProvider):
+    """Measures wall time spent in each tool call"""
+
+    def __init__(self):
+        self.durations: dict[str, float] = defaultdict(float)
+        self._started: dict[str, float] = {}
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(BeforeToolCallEvent, self._before)
+        registry.add_callback(AfterToolCallEvent, self._after)
+
+    def _before(self, event: BeforeToolCallEvent):
+        self._started[event.tool_use["toolUseId"]] = time.perf_counter()
+
+    def _after(self, event: AfterToolCallEvent):
+        start = self._started.pop(event.tool_use["toolUseId"], None)
+        if start is not None:
+            self.durations[event.tool_use["name"]] += time.perf_counter() - start
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="Replay a recorded agent trace and time each turn")
+    parser.add_argument("trace", type=Path, help="Trace file written in record mode")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Playback speed: 1 = recorded timing, 10 = 10x faster, 0 = no waits")
+    args = parser.parse_args(argv)
+
+    from strands import Agent
+    import agent_factory
+    from tool_selector import ToolIndex
+    from tools.piper_speak import DEFAULT_ONNX
+
+    agent_factory.set_trace_mode("replay", args.trace, args.speed)
+    if "piper_speak" in agent_factory.HIVE_REPLAY_LIVE_TOOLS and not Path(DEFAULT_ONNX).is_file():
+        print(f"Warning: Piper voice {DEFAULT_ONNX} not found (set PIPER_VOICE); "
+              f"piper_speak calls will fail and their local time will not measure TTS")
+
+    model = agent_factory.create_model()
+    mcp_client = agent_factory.create_mcp_client()
+    mcp_tools = mcp_client.list_tools_sync()
+    local_tools = agent_factory.create_local_tools()
+    selector = agent_factory.create_selector(ToolIndex(local_tools + mcp_tools))
+    timer = ToolTimer()
+    agent = Agent(
+        model=model,
+        tools=selector.initial_tools(),
+        hooks=[selector, timer],
+        callback_handler=None,
+    )
+
+    # Replayed tools only wait; tools that still run live are timed as local work
+    replayed = [tool for tool in local_tools + mcp_tools if isinstance(tool, ReplayTool)]
+    replayed_names = {tool.tool_name for tool in replayed}
+    print(f"{'turn':>4} {'wall':>9} {'model':>9} {'replayed':>9} {'local':>9} {'overhead':>9}")
+    for turn, prompt in enumerate(model.trace.prompts, start=1):
+        model_before = model.waited
+        replayed_before = sum(tool.waited for tool in replayed)
+        timer.durations.clear()
+
+        start = time.perf_counter()
+        agent(prompt)
+        wall = time.perf_counter() - start
+
+        model_wait = model.waited - model_before
+        replayed_wait = sum(tool.waited for tool in replayed) - replayed_before
+        local = sum(d for name, d in timer.durations.items() if name not in replayed_names)
+        overhead = wall - model_wait - replayed_wait - local
+        print(f"{turn:>4} {wall:>8.3f}s {model_wait:>8.3f}s {replayed_wait:>8.3f}s {local:>8.3f}s {overhead:>8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""Relevance-based tool exposure to keep per-turn tool schemas small"""
+import json
+import logging
+import math
+import re
+from collections import deque
+from typing import Any, Iterable, Optional
+
+from strands import tool
+from strands.hooks import BeforeInvocationEvent, BeforeToolCallEvent, HookProvider, HookRegistry
+from strands.tools.registry import ToolRegistry
+
+logger = logging.getLogger(__name__)
+
+# BM25 tuning constants
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Rough prompt cost of a JSON schema, in characters per token
+CHARS_PER_TOKEN = 4
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase alphanumeric tokens"""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _spec_text(spec: dict[str, Any]) -> str:
+    """Searchable text of a tool spec: name, description and parameters"""
+    parts = [spec.get("name", ""), spec.get("description", "")]
+    schema = spec.get("inputSchema", {}).get("json", {})
+    for name, prop in schema.get("properties", {}).items():
+        parts.append(name)
+        parts.append(prop.get("description", ""))
+    return " ".join(parts)
+
+
+class ToolIndex:
+    """
+    BM25 index over the names, descriptions and parameters of a set of tools.
+
+    Built once and shared by every ToolSelector, so it holds no per-agent state.
+    Accepts anything an Agent accepts as a tool (AgentTools, @tool functions,
+    strands_tools modules); they are loaded into AgentTools first.
+    """
+
+    def __init__(self, tools: Iterable[Any]):
+        self.tools: dict[str, Any] = {}
+        self.spec_tokens: dict[str, int] = {}
+        self._terms: dict[str, dict[str, int]] = {}
+        self._lengths: dict[str, int] = {}
+
+        loader = ToolRegistry()
+        loader.process_tools(list(tools))
+        for agent_tool in loader.registry.values():
+            spec = agent_tool.tool_spec
+            name = agent_tool.tool_name
+            self.tools[name] = agent_tool
+            self.spec_tokens[name] = len(json.dumps(spec)) // CHARS_PER_TOKEN
+            tokens = tokenize(_spec_text(spec))
+            self._lengths[name] = len(tokens)
+            for term in tokens:
+                counts = self._terms.setdefault(term, {})
+                counts[name] = counts.get(name, 0) + 1
+
+        self._avg_length = sum(self._lengths.values()) / len(self._lengths) if self._lengths else 1.0
+
+    def search(self, text: str, limit: int) -> list[tuple[str, float]]:
+        """Rank tools against free text, best first"""
+        n_tools = len(self.tools)
+        scores: dict[str, float] = {}
+        for term in set(tokenize(text)):
+            counts = self._terms.get(term)
+            if not counts:
+                continue
+            idf = math.log(1 + (n_tools - len(counts) + 0.5) / (len(counts) + 0.5))
+            for name, tf in counts.items():
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self._lengths[name] / self._avg_length)
+                scores[name] = scores.get(name, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+
+class ToolSelector(HookProvider):
+    """
+    Expose only the tools relevant to the current turn to one agent.
+
+    Before each invocation the agent's tool registry is narrowed to the pinned
+    tools, the tools the model called on the previous turn, and the top_k
+    matches for the last few user messages, with older messages weighted down
+    by decay per turn. Follow-ups like "do that again" thus keep the tools they
+    refer to. If the model calls a known tool that isn't exposed, or looks one
+    up with find_tools, it is added back for the rest of the turn.
+    """
+
+    def __init__(
+        self,
+        index: ToolIndex,
+        top_k: int = 8,
+        pinned: Iterable[str] = (),
+        history: int = 3,
+        decay: float = 0.5,
+    ):
+        self.index = index
+        self.top_k = top_k
+        self.pinned = [name for name in pinned if name in index.tools]
+        self.decay = decay
+        self.last_report: Optional[dict[str, Any]] = None
+        self.find_tools = self._make_find_tools()
+        # find_tools is sent on every turn, so it counts against the savings
+        self._find_tools_tokens = len(json.dumps(self.find_tools.tool_spec)) // CHARS_PER_TOKEN
+        # Recent user messages, newest last
+        self._history: deque[str] = deque(maxlen=max(1, history))
+        self._called: list[str] = []
+
+    def initial_tools(self) -> list[Any]:
+        """Tools to construct the agent with, before any turn has been seen"""
+        return [self.index.tools[name] for name in self.pinned] + [self.find_tools]
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(BeforeInvocationEvent, self._on_invocation)
+        registry.add_callback(BeforeToolCallEvent, self._on_tool_call)
+
+    def select(self, text: str) -> list[str]:
+        """Pinned tools followed by the best matches for text"""
+        return self._select([text], carried=[])
+
+    def _select(self, texts: list[str], carried: list[str]) -> list[str]:
+        """
+        Pinned tools, then carried over tools, then the best matches for texts.
+
+        Args:
+            texts: Messages to match, newest last; each older one counts decay times less
+            carried: Tools to keep regardless of their score
+        """
+        scores: dict[str, float] = {}
+        weight = 1.0
+        for text in reversed(texts):
+            for name, score in self.index.search(text, self.top_k + len(self.pinned)):
+                scores[name] = scores.get(name, 0.0) + weight * score
+            weight *= self.decay
+        ranked = sorted(scores, key=lambda name: scores[name], reverse=True)
+
+        selected = list(self.pinned)
+        for name in carried:
+            if name not in selected:
+                selected.append(name)
+        limit = len(selected) + self.top_k
+        for name in ranked:
+            if len(selected) >= limit:
+                break
+            if name not in selected:
+                selected.append(name)
+        return selected
+
+    def _expose(self, agent: Any, names: Iterable[str]):
+        """Make the agent's registry hold exactly the given indexed tools"""
+        names = {name for name in names if name in self.index.tools}
+        registry = agent.tool_registry
+        for name in list(registry.registry):
+            if name in self.index.tools and name not in names:
+                del registry.registry[name]
+                registry.dynamic_tools.pop(name, None)
+        for name in names:
+            if name not in registry.registry:
+                registry.register_tool(self.index.tools[name])
+
+    def _report(self, agent: Any):
+        exposed = [name for name in agent.tool_registry.registry if name in self.index.tools]
+        total = sum(self.index.spec_tokens.values())
+        used = sum(self.index.spec_tokens[name] for name in exposed) + self._find_tools_tokens
+        self.last_report = {
+            "exposed": exposed,
+            "exposed_count": len(exposed),
+            "total_count": len(self.index.tools),
+            "schema_tokens": used,
+            "schema_tokens_saved": total - used,
+        }
+        logger.info(
+            f"Exposing {len(exposed)}/{len(self.index.tools)} tools, "
+            f"~{used} schema tokens (~{total - used} saved)"
+        )
+
+    def _on_invocation(self, event: BeforeInvocationEvent):
+        messages = event.messages or event.agent.messages[-1:]
+        text = " ".join(
+            block["text"]
+            for message in messages if message.get("role") == "user"
+            for block in message.get("content", []) if "text" in block
+        )
+        if text.strip():
+            self._history.append(text)
+        carried, self._called = self._called, []
+        self._expose(event.agent, self._select(list(self._history), carried))
+        self._report(event.agent)
+
+    def _on_tool_call(self, event: BeforeToolCallEvent):
+        name = event.tool_use["name"]
+        if name in self.index.tools and name not in self._called:
+            self._called.append(name)
+        if event.selected_tool is None and name in self.index.tools:
+            logger.info(f"Model called unexposed tool '{name}', exposing it")
+            event.selected_tool = self.index.tools[name]
+            self._expose(event.agent, list(event.agent.tool_registry.registry) + [name])
+            self._report(event.agent)
+
+    def _make_find_tools(self):
+        selector = self
+
+        @tool
+        def find_tools(query: str, agent: Any = None) -> str:
+            """
+            Find more tools when none of the available ones fit the task.
+
+            Args:
+                query: What you need a tool for, in a few words
+
+            Returns:
+                Names and descriptions of matching tools, which become callable
+            """
+            matches = [name for name, _ in selector.index.search(query, selector.top_k)]
+            if not matches:
+                return f"No tools match '{query}'"
+            if agent is not None:
+                selector._expose(agent, list(agent.tool_registry.registry) + matches)
+                selector._report(agent)
+            lines = []
+            for name in matches:
+                description = selector.index.tools[name].tool_spec.get("description", "").strip()
+                lines.append(f"- {name}: {(description.splitlines() or [''])[0]}")
+            return "Tools now available:\n" + "\n".join(lines)
+
+        return find_tools
@@ -1,9 +1,50 @@
-from sounddevice import OutputStream
+import os
+
 import numpy as np
 from piper import PiperVoice, SynthesisConfig
 from strands import tool
 
-DEFAULT_ONNX = "tools/piper_resources/en_US-lessac-medium.onnx"
+DEFAULT_ONNX = os.getenv("PIPER_VOICE", "tools/piper_resources/en_US-lessac-medium.onnx")
+# "device" plays through the sound card, "null" synthesizes and discards the audio
+AUDIO_SINK = os.getenv("PIPER_AUDIO_SINK", "device")
+
+
+class NullOutputStream:
+    """Audio sink that accepts and drops samples, for hosts without a sound device"""
+
+    def __init__(self, **kwargs):
+        self.frames = 0
+
+    def start(self):
+        pass
+
+    def write(self, data):
+        self.frames += len(data)
+
+    def stop(self):
+        pass
+
+    def abort(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def set_audio_sink(sink: str):
+    """Select where synthesized speech goes ("device" or "null")"""
+    global AUDIO_SINK
+    if sink not in ("device", "null"):
+        raise ValueError(f"Unknown audio sink '{sink}'")
+    AUDIO_SINK = sink
+
+
+def _open_output(**kwargs):
+    if AUDIO_SINK == "null":
+        return NullOutputStream(**kwargs)
+    # Imported here so hosts without PortAudio can still load the tool
+    from sounddevice import OutputStream
+    return OutputStream(**kwargs)
 
 
 @tool
@@ -19,7 +60,8 @@ def piper_speak(text: str, model_path: str = DEFAULT_ONNX) -> str:
         text: The text content to be spoken aloud. Can be any length, from single words
               to long paragraphs. Supports standard punctuation for natural phrasing.
         model_path: Path to the Piper ONNX voice model file (.onnx). Defaults to
-                    'voice/en_US-lessac-medium.onnx'. Different models provide different
+                    $PIPER_VOICE, else 'tools/piper_resources/en_US-lessac-medium.onnx'.
+                    Different models provide different
                     voices and languages.
 
     Returns:
@@ -43,7 +85,7 @@ def piper_speak(text: str, model_path: str = DEFAULT_ONNX) -> str:
         for chunk in voice.synthesize(text):
             # Initialize stream on first chunk
             if stream is None:
-                stream = OutputStream(
+                stream = _open_output(
                     samplerate=chunk.sample_rate,
                     channels=chunk.sample_channels,
                     dtype=np.int16
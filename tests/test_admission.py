@@ -0,0 +1,168 @@
+"""Tests for tool call admission control"""
+import asyncio
+
+import pytest
+
+from mcp_server.admission import AdmissionController, Overloaded
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def hold(controller, client, tool, started, release):
+    async with controller.slot(client, tool):
+        started.append((client, tool))
+        await release.wait()
+
+
+def test_admits_up_to_max_concurrent_then_queues():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=2, queue_timeout=5)
+        started, release = [], asyncio.Event()
+        tasks = [asyncio.create_task(hold(controller, f"c{i}", "t", started, release)) for i in range(3)]
+        await asyncio.sleep(0)
+        assert len(started) == 2
+        assert controller.stats()["queue_depth"] == 1
+
+        release.set()
+        await asyncio.gather(*tasks)
+        stats = controller.stats()
+        assert len(started) == 3
+        assert stats["in_flight"] == 0
+        assert stats["admitted"] == 3
+
+    run(scenario())
+
+
+def test_high_priority_is_admitted_first():
+    async def scenario():
+        controller = AdmissionController(
+            max_concurrent=1, queue_timeout=5, priorities={"urgent": "high", "batch": "low"},
+        )
+        started, release = [], asyncio.Event()
+        first = asyncio.create_task(hold(controller, "a", "normal", started, release))
+        await asyncio.sleep(0)
+        tasks = [
+            asyncio.create_task(hold(controller, "b", "batch", started, release)),
+            asyncio.create_task(hold(controller, "c", "urgent", started, release)),
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(first, *tasks)
+        assert [tool for _, tool in started] == ["normal", "urgent", "batch"]
+
+    run(scenario())
+
+
+def test_sheds_when_queue_is_full():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queued=1, queue_timeout=5)
+        started, release = [], asyncio.Event()
+        tasks = [asyncio.create_task(hold(controller, f"c{i}", "t", started, release)) for i in range(2)]
+        await asyncio.sleep(0)
+
+        with pytest.raises(Overloaded) as excinfo:
+            await controller.acquire("c2", "t")
+        assert excinfo.value.reason == "queue_full"
+
+        release.set()
+        await asyncio.gather(*tasks)
+
+    run(scenario())
+
+
+def test_queue_timeout_sheds_and_frees_state():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, queue_timeout=0.01)
+        started, release = [], asyncio.Event()
+        task = asyncio.create_task(hold(controller, "a", "t", started, release))
+        await asyncio.sleep(0)
+
+        with pytest.raises(Overloaded) as excinfo:
+            await controller.acquire("b", "t")
+        assert excinfo.value.reason == "timeout"
+
+        release.set()
+        await task
+        stats = controller.stats()
+        assert stats["in_flight"] == 0
+        assert stats["queue_depth"] == 0
+        assert controller._client_load == {}
+
+    run(scenario())
+
+
+def test_client_overflow_queues_behind_its_own_calls():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=10, max_per_client=2, queue_timeout=5)
+        started, release = [], asyncio.Event()
+        tasks = [asyncio.create_task(hold(controller, "shared", "t", started, release)) for _ in range(3)]
+        other = asyncio.create_task(hold(controller, "other", "t", started, release))
+        await asyncio.sleep(0)
+
+        # The third call of "shared" waits, other clients are unaffected
+        assert started.count(("shared", "t")) == 2
+        assert ("other", "t") in started
+        assert controller.stats()["client_queue_depth"] == 1
+
+        release.set()
+        await asyncio.gather(*tasks, other)
+        assert started.count(("shared", "t")) == 3
+        assert controller.stats()["shed_total"] == 0
+        assert controller._client_load == {}
+
+    run(scenario())
+
+
+def test_client_overflow_times_out():
+    async def scenario():
+        controller = AdmissionController(max_per_client=1, queue_timeout=0.01)
+        started, release = [], asyncio.Event()
+        task = asyncio.create_task(hold(controller, "a", "t", started, release))
+        await asyncio.sleep(0)
+
+        with pytest.raises(Overloaded) as excinfo:
+            await controller.acquire("a", "t")
+        assert excinfo.value.reason == "client_limit"
+        assert controller.stats()["client_queue_depth"] == 0
+
+        release.set()
+        await task
+
+    run(scenario())
+
+
+def test_cancelled_waiter_gives_up_its_place():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_per_client=1, queue_timeout=5)
+        started, release = [], asyncio.Event()
+        first = asyncio.create_task(hold(controller, "a", "t", started, release))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(hold(controller, c, "t", started, release)) for c in ("a", "b")]
+        await asyncio.sleep(0)
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+
+        release.set()
+        await first
+        stats = controller.stats()
+        assert stats["in_flight"] == 0
+        assert stats["queue_depth"] == 0
+        assert stats["client_queue_depth"] == 0
+        assert controller._client_load == {}
+
+    run(scenario())
+
+
+def test_session_limits():
+    controller = AdmissionController(max_sessions=2, max_sessions_per_client=1)
+    controller.open_session("a")
+    with pytest.raises(Overloaded):
+        controller.open_session("a")
+    controller.open_session("b")
+    with pytest.raises(Overloaded):
+        controller.open_session("c")
+    controller.close_session("a")
+    controller.open_session("c")
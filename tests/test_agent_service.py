@@ -0,0 +1,155 @@
+"""Tests for the multi-session agent service, run against a replayed trace"""
+import asyncio
+
+import pytest
+from starlette.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+import agent_factory
+import agent_service
+from replay import TraceWriter
+
+ECHO_SPEC = {
+    "name": "echo",
+    "description": "Echo back a message",
+    "inputSchema": {"json": {"type": "object", "properties": {"message": {"type": "string"}}}},
+}
+
+
+def text_turn(text):
+    events = [
+        {"messageStart": {"role": "assistant"}},
+        {"contentBlockDelta": {"delta": {"text": text}}},
+        {"contentBlockStop": {}},
+        {"messageStop": {"stopReason": "end_turn"}},
+    ]
+    return [[0, event] for event in events]
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    """A fresh service whose model and MCP server are served from a trace of two answers"""
+    path = tmp_path / "trace.jsonl"
+    writer = TraceWriter(path)
+    writer.write({"type": "tools", "specs": [ECHO_SPEC]})
+    for i in range(2):
+        writer.write({"type": "model", "events": text_turn(f"answer {i}")})
+    writer.close()
+
+    monkeypatch.setattr(agent_factory, "HIVE_TRACE_MODE", "replay")
+    monkeypatch.setattr(agent_factory, "HIVE_TRACE_FILE", path)
+    monkeypatch.setattr(agent_factory, "HIVE_TRACE_SPEED", 0.0)
+    monkeypatch.setattr(agent_factory, "_trace", None)
+    monkeypatch.setattr(agent_service, "SERVICE_TOKEN", "")
+    fresh = agent_service.AgentService()
+    monkeypatch.setattr(agent_service, "service", fresh)
+    return fresh
+
+
+def with_started(service, scenario):
+    async def run():
+        await service.start()
+        try:
+            return await scenario()
+        finally:
+            await service.stop()
+    return asyncio.run(run())
+
+
+def test_chat_over_http(service):
+    with TestClient(agent_service.app) as client:
+        response = client.post("/sessions/alice/chat", json={"prompt": "hello"})
+        assert response.status_code == 200
+        body = response.json()
+        assert body["response"] == "answer 0"
+        # Only the service's local tools plus the MCP tools are indexed
+        assert body["tools"]["total_count"] == 2
+
+        assert client.get("/stats").json()["sessions"] == 1
+        assert client.delete("/sessions/alice").json() == {"closed": True}
+        assert client.delete("/sessions/alice").status_code == 404
+
+
+@pytest.mark.parametrize("body", ["not json", "[1]", '{"prompt": 3}', '{"prompt": ""}', "{}"])
+def test_chat_rejects_bad_bodies(service, body):
+    with TestClient(agent_service.app) as client:
+        response = client.post("/sessions/alice/chat", content=body)
+    assert response.status_code == 400
+    assert "error" in response.json()
+
+
+def test_chat_reports_failed_turns(service):
+    with TestClient(agent_service.app) as client:
+        for _ in range(2):
+            assert client.post("/sessions/alice/chat", json={"prompt": "hi"}).status_code == 200
+        # The trace has no third answer, so the model raises
+        response = client.post("/sessions/alice/chat", json={"prompt": "hi"})
+    assert response.status_code == 500
+    assert "no more recorded model responses" in response.json()["error"]
+
+
+def test_chat_over_websocket(service):
+    with TestClient(agent_service.app) as client:
+        with client.websocket_connect("/sessions/bob/ws") as ws:
+            ws.send_text("hello")
+            assert ws.receive_json() == {"type": "delta", "data": "answer 0"}
+            assert ws.receive_json() == {"type": "done"}
+
+
+def test_token_is_required_when_set(service, monkeypatch):
+    monkeypatch.setattr(agent_service, "SERVICE_TOKEN", "secret")
+    with TestClient(agent_service.app) as client:
+        assert client.get("/stats").status_code == 401
+        assert client.get("/stats", headers={"Authorization": "Bearer wrong"}).status_code == 401
+        assert client.get("/stats", headers={"Authorization": "Bearer secret"}).status_code == 200
+        with pytest.raises(WebSocketDisconnect):
+            with client.websocket_connect("/sessions/bob/ws") as ws:
+                ws.receive_json()
+
+
+def test_unknown_local_tool_is_rejected(service, monkeypatch):
+    monkeypatch.setattr(agent_service, "SERVICE_LOCAL_TOOLS", ["current_time", "rm_rf"])
+    with pytest.raises(ValueError, match="rm_rf"):
+        asyncio.run(service.start())
+
+
+def test_least_recently_used_session_is_evicted(service, monkeypatch):
+    monkeypatch.setattr(agent_service, "MAX_SESSIONS", 2)
+
+    async def scenario():
+        service.get_session("a")
+        service.get_session("b")
+        service.get_session("a")
+        service.get_session("c")
+        return list(service.sessions)
+
+    assert with_started(service, scenario) == ["a", "c"]
+    assert service.evicted == 1
+
+
+def test_busy_sessions_are_not_evicted(service, monkeypatch):
+    monkeypatch.setattr(agent_service, "MAX_SESSIONS", 2)
+
+    async def scenario():
+        busy = service.get_session("a")
+        service.get_session("b")
+        async with busy.lock:
+            service.get_session("c")
+            return list(service.sessions)
+
+    assert with_started(service, scenario) == ["a", "c"]
+
+
+def test_idle_sessions_are_evicted(service, monkeypatch):
+    monkeypatch.setattr(agent_service, "SESSION_IDLE_TIMEOUT", 60)
+
+    async def scenario():
+        for session_id in ("idle", "busy", "active"):
+            service.get_session(session_id)
+        service.sessions["idle"].last_active -= 120
+        service.sessions["busy"].last_active -= 120
+        async with service.sessions["busy"].lock:
+            evicted = service.evict_idle()
+        return evicted, list(service.sessions)
+
+    assert with_started(service, scenario) == (1, ["busy", "active"])
@@ -0,0 +1,141 @@
+"""Tests for the shared tool result cache"""
+import asyncio
+
+import pytest
+
+from mcp_server.cache import ToolCache, make_key
+
+
+def make_cache(max_entries=16, ttl=60.0):
+    cache = ToolCache(max_entries=max_entries)
+    cache.register("tool", ttl)
+    return cache
+
+
+class Tool:
+    """Fake tool that counts executions and can be held open"""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        return f"result-{self.calls}"
+
+
+def test_make_key_is_canonical():
+    assert make_key("t", {"b": 1, "a": 2}) == make_key("t", {"a": 2, "b": 1})
+    assert make_key("t", None) == make_key("t", {})
+
+
+def test_hit_after_miss():
+    async def scenario():
+        cache = make_cache()
+        tool = Tool()
+        tool.release.set()
+        assert await cache.get_or_call("tool", "k", tool) == "result-1"
+        assert await cache.get_or_call("tool", "k", tool) == "result-1"
+        assert tool.calls == 1
+        assert cache.stats()["tools"]["tool"]["hits"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_expired_entries_are_recomputed():
+    async def scenario():
+        cache = make_cache(ttl=0)
+        tool = Tool()
+        tool.release.set()
+        await cache.get_or_call("tool", "k", tool)
+        assert await cache.get_or_call("tool", "k", tool) == "result-2"
+
+    asyncio.run(scenario())
+
+
+def test_lru_eviction():
+    async def scenario():
+        cache = make_cache(max_entries=2)
+        for key in ("a", "b", "a", "c"):
+            await cache.get_or_call("tool", key, lambda: asyncio.sleep(0, result=key))
+        stats = cache.stats()
+        assert stats["entries"] == 2
+        assert stats["evictions"] == 1
+        assert set(cache._entries) == {"a", "c"}
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_calls_share_one_execution():
+    async def scenario():
+        cache = make_cache()
+        tool = Tool()
+        tasks = [asyncio.create_task(cache.get_or_call("tool", "k", tool)) for _ in range(3)]
+        await asyncio.sleep(0)
+        tool.release.set()
+        assert await asyncio.gather(*tasks) == ["result-1"] * 3
+        assert tool.calls == 1
+        assert cache.stats()["tools"]["tool"]["coalesced"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_failures_propagate_and_are_not_cached():
+    async def scenario():
+        cache = make_cache()
+        attempts = 0
+
+        async def failing():
+            nonlocal attempts
+            attempts += 1
+            await asyncio.sleep(0)
+            raise ValueError("boom")
+
+        tasks = [asyncio.create_task(cache.get_or_call("tool", "k", failing)) for _ in range(2)]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        assert all(isinstance(r, ValueError) for r in results)
+        assert attempts == 1
+        assert cache.stats()["entries"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_leader_cancellation_does_not_cancel_followers():
+    async def scenario():
+        cache = make_cache()
+        tool = Tool()
+        leader = asyncio.create_task(cache.get_or_call("tool", "k", tool))
+        await asyncio.sleep(0)
+        followers = [asyncio.create_task(cache.get_or_call("tool", "k", tool)) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        tool.release.set()
+
+        assert await asyncio.gather(*followers) == ["result-2", "result-2"]
+        assert leader.cancelled()
+        # One follower took over, the other coalesced onto it
+        assert tool.calls == 2
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_follower_leaves_leader_running():
+    async def scenario():
+        cache = make_cache()
+        tool = Tool()
+        leader = asyncio.create_task(cache.get_or_call("tool", "k", tool))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(cache.get_or_call("tool", "k", tool))
+        await asyncio.sleep(0)
+
+        follower.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+        tool.release.set()
+        assert await leader == "result-1"
+
+    asyncio.run(scenario())
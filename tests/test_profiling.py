@@ -0,0 +1,90 @@
+"""Tests for on-demand runtime profiling"""
+import asyncio
+import pstats
+import time
+
+import pytest
+
+from mcp_server.profiling import RuntimeProfiler
+
+
+async def work():
+    await asyncio.sleep(0)
+    return "done"
+
+
+def profile_calls(profiler, tool, mode="sampling", calls=1, call=work):
+    async def scenario():
+        profiler.start(mode=mode, duration=5, tool=tool, calls=calls)
+        return [await profiler.profile_call(call) for _ in range(calls)]
+    return asyncio.run(scenario())
+
+
+def busy_tool_body():
+    """Stands in for a sync tool, which the server runs in a worker thread"""
+    deadline = time.monotonic() + 0.1
+    while time.monotonic() < deadline:
+        pass
+    return "done"
+
+
+async def threaded_work():
+    return await asyncio.to_thread(busy_tool_body)
+
+
+def test_profiles_targeted_calls(tmp_path):
+    profiler = RuntimeProfiler(tmp_path / "profiles")
+
+    assert profile_calls(profiler, "search_files", calls=2) == ["done", "done"]
+
+    assert profiler.session is None
+    [result] = (tmp_path / "profiles").iterdir()
+    assert result.name.endswith("-sampling-search_files.collapsed")
+
+
+def test_sampling_sees_tool_body_in_worker_thread(tmp_path):
+    profiler = RuntimeProfiler(tmp_path, sample_interval=0.001)
+
+    assert profile_calls(profiler, "multiply", call=threaded_work) == ["done"]
+
+    [result] = tmp_path.iterdir()
+    assert "busy_tool_body (test_profiling.py)" in result.read_text()
+
+
+def test_cprofile_is_rejected_for_tool_sessions(tmp_path):
+    profiler = RuntimeProfiler(tmp_path)
+
+    with pytest.raises(ValueError, match="sampling"):
+        profile_calls(profiler, "multiply", mode="cprofile")
+    assert profiler.session is None
+
+
+def test_cprofile_window(tmp_path):
+    profiler = RuntimeProfiler(tmp_path)
+
+    async def scenario():
+        profiler.start(mode="cprofile", duration=5)
+        await work()
+        return profiler.stop()
+
+    result = asyncio.run(scenario())
+    assert result.suffix == ".pstats"
+    assert pstats.Stats(str(result)).total_calls > 0
+
+
+def test_tool_name_is_sanitized_in_file_name(tmp_path):
+    profiler = RuntimeProfiler(tmp_path / "profiles")
+
+    profile_calls(profiler, "../../etc/x y")
+
+    [result] = (tmp_path / "profiles").iterdir()
+    assert result.name.endswith("-sampling-.._.._etc_x_y.collapsed")
+
+
+def test_unwritable_output_does_not_fail_the_call(tmp_path):
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+    profiler = RuntimeProfiler(blocker / "profiles")
+
+    assert profile_calls(profiler, "search_files") == ["done"]
+    assert profiler.session is None
@@ -0,0 +1,238 @@
+"""Tests for recording agent traces and replaying them offline"""
+import asyncio
+import gzip
+import shutil
+
+import pytest
+from pydantic import BaseModel
+from strands import Agent, tool
+from strands.models import Model
+
+import agent_factory
+import replay as replay_module
+from replay import (
+    RecordingModel,
+    RecordingTool,
+    ReplayModel,
+    ReplayTool,
+    Trace,
+    TraceHooks,
+    TraceWriter,
+)
+from tools import piper_speak
+
+
+@tool
+def lookup(key: str) -> str:
+    """
+    Look up a value by key.
+
+    Args:
+        key: Key to look up
+    """
+    return f"value-of-{key}"
+
+
+def text_turn(text):
+    return [
+        {"messageStart": {"role": "assistant"}},
+        {"contentBlockDelta": {"delta": {"text": text}}},
+        {"contentBlockStop": {}},
+        {"messageStop": {"stopReason": "end_turn"}},
+    ]
+
+
+def tool_turn(tool_use_id, name, tool_input):
+    return [
+        {"messageStart": {"role": "assistant"}},
+        {"contentBlockStart": {"start": {"toolUse": {"toolUseId": tool_use_id, "name": name}}}},
+        {"contentBlockDelta": {"delta": {"toolUse": {"input": tool_input}}}},
+        {"contentBlockStop": {}},
+        {"messageStop": {"stopReason": "tool_use"}},
+    ]
+
+
+class Answer(BaseModel):
+    value: int
+
+
+class ScriptedModel(Model):
+    """Live model stand-in that streams a fixed script of turns"""
+
+    def __init__(self, turns):
+        self.turns = list(turns)
+
+    def update_config(self, **model_config):
+        pass
+
+    def get_config(self):
+        return {}
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        yield {"output": output_model(value=42)}
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        for event in self.turns.pop(0):
+            yield event
+
+
+def record(path):
+    """Run a live session through the recording wrappers, returning the answers and the writer"""
+    writer = TraceWriter(path)
+    writer.write({"type": "tools", "specs": [lookup.tool_spec]})
+    model = RecordingModel(ScriptedModel([
+        tool_turn("t1", "lookup", '{"key": "a"}'),
+        text_turn("The value is value-of-a."),
+        text_turn("Goodbye."),
+    ]), writer)
+    agent = Agent(
+        model=model,
+        tools=[RecordingTool(lookup, writer)],
+        hooks=[TraceHooks(writer)],
+        callback_handler=None,
+    )
+    answers = [str(agent("What is a?")).strip(), str(agent("Bye")).strip()]
+    answers.append(agent.structured_output(Answer, "How much?").value)
+    return answers, writer
+
+
+def replay(path):
+    trace = Trace(path)
+    model = ReplayModel(trace, speed=0)
+    agent = Agent(
+        model=model,
+        tools=[ReplayTool(spec, trace, speed=0) for spec in trace.tool_specs],
+        callback_handler=None,
+    )
+    answers = [str(agent(prompt)).strip() for prompt in trace.prompts]
+    answers.append(agent.structured_output(Answer, "How much?").value)
+    return answers, agent
+
+
+@pytest.mark.parametrize("name", ["trace.jsonl", "trace.jsonl.gz"])
+def test_record_then_replay(tmp_path, name):
+    path = tmp_path / name
+    recorded, writer = record(path)
+    writer.close()
+
+    replayed, agent = replay(path)
+
+    assert recorded == ["The value is value-of-a.", "Goodbye.", 42]
+    assert replayed == recorded
+    tool_results = [
+        block["toolResult"] for message in agent.messages
+        for block in message["content"] if "toolResult" in block
+    ]
+    assert tool_results[0]["content"] == [{"text": "value-of-a"}]
+
+
+def test_gzip_trace_without_end_marker_still_loads(tmp_path):
+    path = tmp_path / "trace.jsonl.gz"
+    recorded, writer = record(path)
+    # Snapshot the file as a crashed process would leave it: flushed, never closed
+    crashed = tmp_path / "crashed.jsonl.gz"
+    shutil.copy(path, crashed)
+    writer.close()
+
+    with pytest.raises(EOFError):
+        with gzip.open(crashed, "rt") as f:
+            f.read()
+    replayed, _ = replay(crashed)
+
+    assert replayed == recorded
+
+
+def test_incomplete_last_record_is_ignored(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    _, writer = record(path)
+    writer.close()
+    with path.open("a") as f:
+        f.write('{"type": "prompt", "te')
+
+    trace = Trace(path)
+
+    assert trace.prompts == ["What is a?", "Bye"]
+
+
+def test_structured_output_model_mismatch_is_reported(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    _, writer = record(path)
+    writer.close()
+
+    class Other(BaseModel):
+        value: int
+
+    model = ReplayModel(Trace(path), speed=0)
+
+    async def consume():
+        return [event async for event in model.structured_output(Other, [])]
+
+    with pytest.raises(RuntimeError, match="recorded structured output for 'Answer'"):
+        asyncio.run(consume())
+
+
+@pytest.fixture
+def trace_mode(monkeypatch):
+    """Let a test switch agent_factory's trace mode, restoring it afterwards"""
+    for name in ("HIVE_TRACE_MODE", "HIVE_TRACE_FILE", "HIVE_TRACE_SPEED", "_trace", "_trace_writer"):
+        monkeypatch.setattr(agent_factory, name, getattr(agent_factory, name))
+    monkeypatch.setattr(piper_speak, "AUDIO_SINK", piper_speak.AUDIO_SINK)
+    yield agent_factory.set_trace_mode
+    agent_factory.close_trace_writer()
+
+
+def test_replayed_local_tools_except_tts(tmp_path, trace_mode):
+    path = tmp_path / "trace.jsonl"
+    path.write_text("")
+    trace_mode("replay", path, 0.0)
+
+    tools = {tool.tool_name: tool for tool in agent_factory.create_local_tools()}
+
+    assert isinstance(tools["current_time"], ReplayTool)
+    assert isinstance(tools["file_write"], ReplayTool)
+    assert tools["piper_speak"].tool_name == "piper_speak"
+    assert not isinstance(tools["piper_speak"], ReplayTool)
+    assert piper_speak.AUDIO_SINK == "null"
+
+
+def test_recorded_local_tools(tmp_path, trace_mode):
+    path = tmp_path / "trace.jsonl"
+    trace_mode("record", path)
+
+    tools = agent_factory.create_local_tools(agent_factory.local_tools(["current_time"]))
+
+    assert [type(tool) for tool in tools] == [RecordingTool]
+    assert tools[0].tool_name == "current_time"
+
+
+def test_replay_main_reports_each_turn(tmp_path, trace_mode, capsys):
+    path = tmp_path / "trace.jsonl"
+    writer = TraceWriter(path)
+    writer.write({"type": "tools", "specs": [lookup.tool_spec]})
+    writer.write({"type": "prompt", "text": "What time is it?"})
+    writer.write({"type": "model", "events": [[0.2, event] for event in tool_turn("t1", "current_time", "{}")]})
+    writer.write({
+        "type": "tool",
+        "name": "current_time",
+        "input": {},
+        "duration": 0.5,
+        "result": {"toolUseId": "t1", "status": "success", "content": [{"text": "2000-01-01T00:00:00"}]},
+    })
+    writer.write({"type": "model", "events": [[0.1, event] for event in text_turn("It is midnight.")]})
+    writer.write({"type": "prompt", "text": "Thanks"})
+    writer.write({"type": "model", "events": [[0.1, event] for event in text_turn("You're welcome.")]})
+    writer.close()
+
+    replay_module.main([str(path), "--speed", "100"])
+
+    lines = capsys.readouterr().out.splitlines()
+    header = next(line for line in lines if line.split()[:1] == ["turn"])
+    assert header.split() == ["turn", "wall", "model", "replayed", "local", "overhead"]
+    rows = [line.split() for line in lines if line.split()[:1] in (["1"], ["2"])]
+    assert [row[0] for row in rows] == ["1", "2"]
+    seconds = [[float(value.rstrip("s")) for value in row[1:]] for row in rows]
+    # current_time came from the trace: its recorded 0.5s at 100x, not a live call
+    assert seconds[0][2] == pytest.approx(0.005, abs=1e-6)
+    assert seconds[0][3] == 0.0
+    assert seconds[1][2] == 0.0
+    assert seconds[0][1] == pytest.approx(0.014, abs=1e-3)
@@ -0,0 +1,128 @@
+"""Tests for the incremental full-text search index"""
+import json
+
+from mcp_server.search_index import SearchIndex
+
+
+def make_index(tmp_path, **kwargs):
+    root = tmp_path / "data"
+    root.mkdir(exist_ok=True)
+    kwargs.setdefault("refresh_interval", 0)
+    kwargs.setdefault("save_delay", 60)
+    return root, SearchIndex(root, tmp_path / "index.json", **kwargs)
+
+
+def test_ranks_and_locates_matches(tmp_path):
+    root, index = make_index(tmp_path)
+    (root / "a.txt").write_text("nothing here\nthe needle is here\n")
+    (root / "b.txt").write_text("needle needle needle\n")
+
+    index.refresh(force=True)
+    results = index.search("needle")
+
+    assert [r["path"] for r in results] == ["b.txt", "a.txt"]
+    assert results[1]["line"] == 2
+    assert results[1]["column"] == 4
+    assert results[1]["snippet"] == "the needle is here"
+
+
+def test_form_feed_does_not_shift_lines(tmp_path):
+    root, index = make_index(tmp_path)
+    (root / "doc.txt").write_text("hello world\n\fpage two\nthe needle is here\n")
+
+    index.refresh(force=True)
+    [hit] = index.search("needle")
+
+    assert hit["line"] == 3
+    assert hit["column"] == 4
+    assert hit["snippet"] == "the needle is here"
+
+
+def test_column_points_at_whole_token(tmp_path):
+    root, index = make_index(tmp_path)
+    (root / "doc.txt").write_text("concatenate cat\n")
+
+    index.refresh(force=True)
+    [hit] = index.search("cat")
+
+    assert hit["column"] == 12
+
+
+def test_refresh_only_reindexes_changes(tmp_path):
+    root, index = make_index(tmp_path)
+    (root / "keep.txt").write_text("alpha\n")
+    (root / "gone.txt").write_text("beta\n")
+    assert index.refresh(force=True) == 2
+    assert index.refresh(force=True) == 0
+
+    (root / "gone.txt").unlink()
+    (root / "keep.txt").write_text("alpha gamma\n")
+
+    assert index.refresh(force=True) == 2
+    assert index.search("beta") == []
+    assert [r["path"] for r in index.search("gamma")] == ["keep.txt"]
+
+
+def test_skips_hidden_binary_and_excluded(tmp_path):
+    root, index = make_index(tmp_path, exclude_dirs=("profiles",))
+    (root / ".hidden.txt").write_text("secret\n")
+    (root / "blob.bin").write_bytes(b"secret\x00\x01")
+    (root / "profiles").mkdir()
+    (root / "profiles" / "run.collapsed").write_text("secret;stack 3\n")
+
+    index.refresh(force=True)
+    assert index.search("secret") == []
+    # Skipped files are not re-read until they change
+    assert index.refresh(force=True) == 0
+
+
+def test_save_is_deferred_and_reloaded(tmp_path):
+    root, index = make_index(tmp_path)
+    (root / "doc.txt").write_text("persisted words\n")
+    index.refresh(force=True)
+
+    # Refreshing leaves the write to the background timer
+    assert not index.index_path.exists()
+
+    index.flush()
+    data = json.loads(index.index_path.read_text())
+    assert list(data["docs"]) == ["doc.txt"]
+
+    reloaded = SearchIndex(root, index.index_path, refresh_interval=0, save_delay=60)
+    assert reloaded.stats()["documents"] == 1
+    assert reloaded.refresh(force=True) == 0
+
+
+def test_background_save_runs_after_delay(tmp_path):
+    root, index = make_index(tmp_path, save_delay=0.01)
+    (root / "doc.txt").write_text("words\n")
+    index.refresh(force=True)
+
+    index._save_timer.join(5)
+
+    assert index.index_path.exists()
+
+
+def test_search_does_not_refresh(tmp_path):
+    root, index = make_index(tmp_path)
+    index.refresh(force=True)
+    (root / "late.txt").write_text("fresh words\n")
+
+    assert index.search("fresh") == []
+    index.refresh(force=True)
+    assert [r["path"] for r in index.search("fresh")] == ["late.txt"]
+
+
+def test_background_refresh(tmp_path):
+    root, index = make_index(tmp_path, refresh_interval=0.01)
+    (root / "doc.txt").write_text("background words\n")
+    assert not index.ready
+
+    index.start()
+    try:
+        assert index._ready.wait(5)
+        assert [r["path"] for r in index.search("background")] == ["doc.txt"]
+    finally:
+        index.stop()
+    # stop() writes the pending changes
+    assert index.index_path.exists()
@@ -0,0 +1,121 @@
+"""Tests for tool pack discovery, enable flags and lazy imports"""
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from mcp_server.tools import registry
+from mcp_server.tools.registry import ToolPack, discover_packs, is_enabled, lazy, load_tool_packs
+
+
+@pytest.fixture
+def pack_dir(tmp_path, monkeypatch):
+    """Directory on sys.path for throwaway pack modules, unloaded afterwards"""
+    monkeypatch.syspath_prepend(str(tmp_path))
+    before = set(sys.modules)
+    yield tmp_path
+    for name in set(sys.modules) - before:
+        del sys.modules[name]
+
+
+@pytest.fixture
+def flags(monkeypatch, tmp_path):
+    """Isolate the enable flags from the real environment and .env file"""
+    monkeypatch.setattr(registry.config, "disabled_tool_packs", [])
+    monkeypatch.setitem(registry.config.model_config, "env_file", str(tmp_path / "missing.env"))
+    for name in list(registry.os.environ):
+        if name.startswith("MCP_ENABLE_"):
+            monkeypatch.delenv(name)
+    return monkeypatch
+
+
+def test_builtin_flag_wins_over_disabled_list(flags):
+    flags.setattr(registry.config, "enable_example_tools", True)
+    flags.setattr(registry.config, "disabled_tool_packs", ["example"])
+    assert is_enabled(ToolPack("example", "x"))
+
+    flags.setattr(registry.config, "enable_example_tools", False)
+    flags.setattr(registry.config, "disabled_tool_packs", [])
+    assert not is_enabled(ToolPack("example", "x"))
+
+
+def test_entry_point_pack_flag_from_environment(flags):
+    pack = ToolPack("my-weather", "x")
+    assert is_enabled(pack)
+
+    flags.setattr(registry.config, "disabled_tool_packs", ["my-weather"])
+    assert not is_enabled(pack)
+
+    flags.setenv("MCP_ENABLE_MY_WEATHER_TOOLS", "true")
+    assert is_enabled(pack)
+
+    flags.setattr(registry.config, "disabled_tool_packs", [])
+    flags.setenv("MCP_ENABLE_MY_WEATHER_TOOLS", "0")
+    assert not is_enabled(pack)
+
+    flags.setenv("MCP_ENABLE_MY_WEATHER_TOOLS", "maybe")
+    with pytest.raises(ValueError):
+        is_enabled(pack)
+
+
+def test_entry_point_pack_flag_from_env_file(flags, tmp_path):
+    env_file = tmp_path / "pack.env"
+    env_file.write_text("MCP_ENABLE_WEATHER_TOOLS=false\n")
+    flags.setitem(registry.config.model_config, "env_file", str(env_file))
+
+    assert not is_enabled(ToolPack("weather", "x"))
+
+
+def test_disabled_pack_is_never_imported(flags, pack_dir):
+    (pack_dir / "on_pack.py").write_text("")
+    (pack_dir / "off_pack.py").write_text("")
+    flags.setattr(registry, "BUILTIN_PACKS", [ToolPack("on", "on_pack"), ToolPack("off", "off_pack")])
+    flags.setattr(registry, "entry_points", lambda group: [])
+    flags.setattr(registry.config, "disabled_tool_packs", ["off"])
+
+    assert load_tool_packs() == ["on"]
+    assert "on_pack" in sys.modules
+    assert "off_pack" not in sys.modules
+
+
+def test_broken_pack_does_not_stop_the_others(flags, pack_dir):
+    (pack_dir / "broken_pack.py").write_text("raise ImportError('missing dependency')\n")
+    (pack_dir / "good_pack.py").write_text("")
+    flags.setattr(registry, "BUILTIN_PACKS", [ToolPack("broken", "broken_pack"), ToolPack("good", "good_pack")])
+    flags.setattr(registry, "entry_points", lambda group: [])
+
+    assert load_tool_packs() == ["good"]
+
+
+def test_duplicate_entry_point_names_are_ignored(monkeypatch):
+    def ep(name, module):
+        return SimpleNamespace(name=name, module=module, value=module)
+
+    monkeypatch.setattr(registry, "entry_points", lambda group: [
+        ep("example", "shadow.tools"),
+        ep("weather", "weather_a.tools"),
+        ep("weather", "weather_b.tools"),
+    ])
+
+    packs = {pack.name: pack.module for pack in discover_packs()}
+
+    assert packs["example"] == f"{registry.__package__}.example_tools"
+    assert packs["weather"] == "weather_a.tools"
+    assert list(packs).count("weather") == 1
+
+
+def test_lazy_imports_on_first_call_only(pack_dir):
+    (pack_dir / "heavy_impl.py").write_text("def double(x):\n    return 2 * x\n")
+    double = lazy("heavy_impl:double")
+    assert "heavy_impl" not in sys.modules
+
+    assert double(2) == 4
+    module = sys.modules["heavy_impl"]
+    assert double(3) == 6
+    assert sys.modules["heavy_impl"] is module
+    assert double.__name__ == "double"
+
+
+def test_lazy_rejects_targets_without_attribute():
+    with pytest.raises(ValueError):
+        lazy("heavy_impl")
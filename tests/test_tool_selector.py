@@ -0,0 +1,105 @@
+"""Tests for relevance-based tool exposure"""
+import json
+from types import SimpleNamespace
+
+from strands import tool
+
+from tool_selector import ToolIndex, ToolSelector
+
+
+@tool
+def get_weather(city: str) -> str:
+    """
+    Get the weather forecast for a city.
+
+    Args:
+        city: City to get the forecast for
+    """
+    return "sunny"
+
+
+@tool
+def send_email(to: str, body: str) -> str:
+    """
+    Send an email message.
+
+    Args:
+        to: Recipient address
+        body: Message text
+    """
+    return "sent"
+
+
+@tool
+def current_time() -> str:
+    """Get the current time"""
+    return "noon"
+
+
+def make_selector(**kwargs):
+    index = ToolIndex([get_weather, send_email, current_time])
+    return ToolSelector(index, top_k=1, pinned=["current_time"], **kwargs)
+
+
+def user(text):
+    return {"role": "user", "content": [{"text": text}]}
+
+
+def turn(selector, text):
+    """Run the selector's invocation hook against a fake agent and return the exposed tools"""
+    registry = SimpleNamespace(registry={}, dynamic_tools={})
+    registry.register_tool = lambda t: registry.registry.__setitem__(t.tool_name, t)
+    agent = SimpleNamespace(tool_registry=registry, messages=[])
+    selector._on_invocation(SimpleNamespace(agent=agent, messages=[user(text)]))
+    return list(registry.registry)
+
+
+def test_select_pins_then_ranks():
+    selector = make_selector()
+    assert selector.select("what is the weather in Paris") == ["current_time", "get_weather"]
+    assert selector.select("please send an email") == ["current_time", "send_email"]
+
+
+def test_follow_up_keeps_recent_tools():
+    selector = make_selector()
+    turn(selector, "what is the weather forecast in Paris")
+    assert "get_weather" in turn(selector, "yes, do that again")
+
+
+def test_newest_message_outweighs_older_ones():
+    selector = make_selector()
+    turn(selector, "what is the weather forecast in Paris")
+    assert "send_email" in turn(selector, "now send an email")
+
+
+def test_called_tools_are_carried_over():
+    selector = make_selector(history=1)
+    turn(selector, "what is the weather in Paris")
+    selector._on_tool_call(SimpleNamespace(
+        tool_use={"name": "send_email"}, selected_tool=send_email, agent=None,
+    ))
+    assert "send_email" in turn(selector, "yes")
+    # Only for the next turn
+    assert "send_email" not in turn(selector, "ok")
+
+
+def test_index_accepts_local_tool_modules():
+    from agent_factory import LOCAL_TOOLS
+
+    index = ToolIndex(LOCAL_TOOLS)
+
+    assert {"current_time", "file_read", "file_write", "piper_speak"} <= set(index.tools)
+    assert all(hasattr(t, "tool_spec") for t in index.tools.values())
+
+
+def test_report_counts_find_tools_schema():
+    selector = make_selector()
+    exposed = turn(selector, "what is the weather in Paris")
+    report = selector.last_report
+
+    find_tools_tokens = len(json.dumps(selector.find_tools.tool_spec)) // 4
+    exposed_tokens = sum(selector.index.spec_tokens[name] for name in exposed)
+    total = sum(selector.index.spec_tokens.values())
+    assert find_tools_tokens > 0
+    assert report["schema_tokens"] == exposed_tokens + find_tools_tokens
+    assert report["schema_tokens_saved"] == total - exposed_tokens - find_tools_tokens